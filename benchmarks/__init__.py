@@ -0,0 +1,5 @@
+"""Performance benchmarks for the executor, templates and monitoring.
+
+Run ``python -m benchmarks`` from the repository root. See ``harness`` for
+the results format and the regression gate.
+"""
@@ -0,0 +1,49 @@
+"""Run the benchmark suite, write the results and compare them to a baseline.
+
+Exits with status 1 when a benchmark regressed beyond its threshold.
+"""
+
+import argparse
+import sys
+
+from .harness import compare, format_comparisons, load_results, write_results
+from .suite import BENCHMARKS, run_all
+
+
+def _threshold(value: str):
+    name, _, limit = value.partition("=")
+    if not limit:
+        raise argparse.ArgumentTypeError("expected NAME=FRACTION")
+    return name, float(limit)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--out", default="benchmark-results.json", help="results file to write")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.15,
+        help="allowed relative slowdown before failing (default 0.15)",
+    )
+    parser.add_argument(
+        "--limit", type=_threshold, action="append", default=[], metavar="NAME=FRACTION",
+        help="per-benchmark threshold override, may be repeated",
+    )
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply workload sizes")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="benchmark group to run")
+    args = parser.parse_args(argv)
+
+    results = run_all(args.scale, args.only)
+    data = write_results(args.out, results)
+    for name, result in data["benchmarks"].items():
+        print(f"{name:<28} {result['value']:>14.6g} {result['unit']}")
+    if not args.baseline:
+        return 0
+    comparisons = compare(data, load_results(args.baseline), args.threshold, dict(args.limit))
+    print()
+    print(format_comparisons(comparisons))
+    return 1 if any(c.regressed for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
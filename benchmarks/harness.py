@@ -0,0 +1,167 @@
+"""Result format, statistics and baseline comparison for the benchmark suite.
+
+Results are written as JSON::
+
+    {
+      "format": 1,
+      "created_at": "...",
+      "environment": {"python": "...", "platform": "...", "cpus": 8},
+      "benchmarks": {
+        "executor_overhead": {
+          "value": 0.00012, "unit": "s", "higher_is_better": false,
+          "samples": 2000, "mean": ..., "p50": ..., "p95": ..., "p99": ...,
+          "min": ..., "max": ...
+        }
+      }
+    }
+
+``value`` is the headline number compared against the baseline.
+"""
+
+import json
+import os
+import platform
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+FORMAT_VERSION = 1
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Return the ``q`` quantile (0-1) of ``values`` by linear interpolation."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool = False
+    samples: int = 0
+    stats: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_samples(cls, name: str, samples: Sequence[float], unit: str = "s") -> "BenchmarkResult":
+        """Summarize latency samples; the headline value is the median."""
+        stats = {
+            "mean": sum(samples) / len(samples),
+            "p50": percentile(samples, 0.50),
+            "p95": percentile(samples, 0.95),
+            "p99": percentile(samples, 0.99),
+            "min": min(samples),
+            "max": max(samples),
+        }
+        return cls(name, stats["p50"], unit, samples=len(samples), stats=stats)
+
+    @classmethod
+    def rate(cls, name: str, operations: int, seconds: float, unit: str = "ops/s") -> "BenchmarkResult":
+        return cls(
+            name,
+            operations / seconds,
+            unit,
+            higher_is_better=True,
+            samples=operations,
+            stats={"elapsed": seconds},
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["name"]
+        data.update(data.pop("stats"))
+        return data
+
+
+def timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def write_results(path: str, results: List[BenchmarkResult]) -> Dict[str, Any]:
+    data = {
+        "format": FORMAT_VERSION,
+        "created_at": datetime.utcnow().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "benchmarks": {r.name: r.to_dict() for r in results},
+    }
+    with open(path, "w") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+    return data
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path) as fh:
+        data = json.load(fh)
+    if data.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported benchmark format in {path}: {data.get('format')}")
+    return data
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline: float
+    current: float
+    change: float  # relative slowdown; positive is worse
+    threshold: float
+
+    @property
+    def regressed(self) -> bool:
+        return self.change > self.threshold
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    default_threshold: float = 0.15,
+    thresholds: Optional[Dict[str, float]] = None,
+) -> List[Comparison]:
+    """Compare the headline values of benchmarks present in both results.
+
+    ``thresholds`` overrides ``default_threshold`` per benchmark name. The
+    change is relative to the baseline and oriented so that a positive value
+    always means slower.
+    """
+    thresholds = thresholds or {}
+    comparisons = []
+    for name, base in sorted(baseline["benchmarks"].items()):
+        cur = current["benchmarks"].get(name)
+        if cur is None or not base["value"]:
+            continue
+        change = (cur["value"] - base["value"]) / base["value"]
+        if base.get("higher_is_better"):
+            change = -change
+        comparisons.append(
+            Comparison(
+                name=name,
+                baseline=base["value"],
+                current=cur["value"],
+                change=change,
+                threshold=thresholds.get(name, default_threshold),
+            )
+        )
+    return comparisons
+
+
+def format_comparisons(comparisons: List[Comparison]) -> str:
+    lines = []
+    for c in comparisons:
+        flag = "REGRESSION" if c.regressed else "ok"
+        lines.append(
+            f"{c.name:<28} {c.baseline:>14.6g} -> {c.current:<14.6g} "
+            f"{c.change:+8.1%} (limit {c.threshold:.0%}) {flag}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,148 @@
+"""Benchmark cases.
+
+The executor runs against in-process agents, and the third-party packages are
+replaced by the stubs in ``tests/__init__.py``. The numbers therefore measure
+this package's own overhead, not Ollama or the browser.
+"""
+
+import asyncio
+import os
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+import tests  # noqa: F401  installs stub browser_use / langchain_ollama modules
+
+from deepseek_browser.monitoring import Monitor
+from deepseek_browser.task_executor import Task, TaskExecutor
+from deepseek_browser.templates import TaskTemplate, TemplateLibrary
+
+from .harness import BenchmarkResult, timed
+
+# Short rate benchmarks report their best run, which is far less noisy than
+# a single run on shared CI machines.
+REPEAT = 3
+
+
+class BenchAgent:
+    """Agent stand-in that optionally sleeps to emulate I/O-bound work."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+
+    async def create_agent(self) -> None:
+        pass
+
+    async def run_task(self, description: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return ["ok"]
+
+    async def close(self) -> None:
+        pass
+
+
+def executor_overhead(scale: float) -> List[BenchmarkResult]:
+    count = max(int(2000 * scale), 50)
+
+    async def run() -> List[float]:
+        loop = asyncio.get_running_loop()
+        executor = TaskExecutor(agent=BenchAgent())
+        await executor.start()
+        samples = []
+        for _ in range(count):
+            start = loop.time()
+            await executor.execute("bench")
+            samples.append(loop.time() - start)
+        await executor.close()
+        return samples
+
+    return [BenchmarkResult.from_samples("executor_overhead", asyncio.run(run()))]
+
+
+def throughput(scale: float) -> List[BenchmarkResult]:
+    count = max(int(1000 * scale), 100)
+    results = []
+    for concurrency in (1, 8, 64, 512):
+
+        async def run() -> float:
+            executor = TaskExecutor(agent=BenchAgent(delay=0.001))
+            await executor.start()
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            async for _ in executor.execute_many(
+                (f"task {i}" for i in range(count)), concurrency=concurrency
+            ):
+                pass
+            elapsed = loop.time() - start
+            await executor.close()
+            return elapsed
+
+        elapsed = min(asyncio.run(run()) for _ in range(REPEAT))
+        results.append(BenchmarkResult.rate(f"throughput_c{concurrency}", count, elapsed))
+    return results
+
+
+def template_render(scale: float) -> List[BenchmarkResult]:
+    count = max(int(200_000 * scale), 1000)
+    library = TemplateLibrary()
+    library.add(TaskTemplate(name="search", content="Search {site} for {product} under {price} USD"))
+    rows = [{"site": "example.com", "product": f"item {i}", "price": i} for i in range(count)]
+
+    def run() -> None:
+        for _ in library.render_many("search", rows):
+            pass
+
+    elapsed = min(timed(run) for _ in range(REPEAT))
+    return [BenchmarkResult.rate("template_render", count, elapsed, unit="renders/s")]
+
+
+def _filled_monitor(count: int) -> Monitor:
+    monitor = Monitor()
+    task = Task(description="bench", task_id=0, status="success")
+    for i in range(count):
+        task.task_id = i
+        monitor.record_task(task, 0.001 * (i % 100))
+    return monitor
+
+
+def monitor_record(scale: float) -> List[BenchmarkResult]:
+    count = max(int(1_000_000 * scale), 1000)
+    monitor = Monitor()
+    task = Task(description="bench", task_id=0, status="success")
+
+    def run() -> None:
+        for i in range(count):
+            task.task_id = i
+            monitor.record_task(task, 0.001 * (i % 100))
+
+    return [BenchmarkResult.rate("monitor_record", count, timed(run), unit="records/s")]
+
+
+def export_json(scale: float) -> List[BenchmarkResult]:
+    monitor = _filled_monitor(max(int(100_000 * scale), 1000))
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        samples = [timed(lambda: monitor.export_json(path)) for _ in range(3)]
+    finally:
+        os.unlink(path)
+    return [BenchmarkResult.from_samples("export_json", samples)]
+
+
+BENCHMARKS: Dict[str, Callable[[float], List[BenchmarkResult]]] = {
+    "executor_overhead": executor_overhead,
+    "throughput": throughput,
+    "template_render": template_render,
+    "monitor_record": monitor_record,
+    "export_json": export_json,
+}
+
+
+def run_all(scale: float = 1.0, only: Optional[List[str]] = None) -> List[BenchmarkResult]:
+    """Run the selected benchmark groups; ``scale`` shrinks or grows sizes."""
+    results: List[BenchmarkResult] = []
+    for name, bench in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        results.extend(bench(scale))
+    return results
@@ -0,0 +1,52 @@
+"""Record a run against a real Ollama server once, then replay it offline."""
+
+import asyncio
+import sys
+
+from deepseek_browser import TaskExecutor
+from deepseek_browser.replay import (
+    OllamaRecorder,
+    OllamaReplayServer,
+    Recording,
+    StaticSiteServer,
+    snapshot_page,
+)
+from ollama_config import BrowserAgentConfig
+
+RECORDING = "replay.json"
+PAGES = "replay_pages"
+
+
+async def record() -> None:
+    # Snapshot the page so replays never leave the machine
+    snapshot_page("https://example.com/", PAGES)
+    # The site port changes between runs; record it as an alias
+    async with StaticSiteServer(PAGES) as site, OllamaRecorder(
+        "http://localhost:11434", aliases={"site": site.url}
+    ) as ollama:
+        executor = TaskExecutor(BrowserAgentConfig(ollama_url=ollama.url, temperature=0))
+        await executor.start()
+        try:
+            task = await executor.execute(f"Open {site.url}/example.com/ and report the heading")
+            print(task.status)
+        finally:
+            await executor.close()
+    ollama.recording.save(RECORDING)
+
+
+async def replay() -> None:
+    recording = Recording.load(RECORDING)
+    async with StaticSiteServer(PAGES) as site, OllamaReplayServer(
+        recording, aliases={"site": site.url}
+    ) as ollama:
+        executor = TaskExecutor(BrowserAgentConfig(ollama_url=ollama.url, temperature=0))
+        await executor.start()
+        try:
+            task = await executor.execute(f"Open {site.url}/example.com/ and report the heading")
+            print(task.status, "misses:", ollama.misses)
+        finally:
+            await executor.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(record() if sys.argv[1:] == ["record"] else replay())
@@ -2,11 +2,13 @@
 
 import asyncio
 from deepseek_browser import TaskExecutor
+from ollama_config import BrowserAgentConfig
 from task_templates import task_templates
 
 
 async def run_many() -> None:
-    executor = TaskExecutor()
+    # One pooled browser session per concurrent task
+    executor = TaskExecutor(BrowserAgentConfig(pool_size=3))
     await executor.start()
     try:
         tasks = [
@@ -1,13 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
 import logging
 import time
 from dataclasses import dataclass, field
-from typing import Any, Optional, Tuple
-
-from browser_use import Agent, BrowserProfile, BrowserSession
-from browser_use.logging_config import setup_logging
-from langchain_ollama import ChatOllama
+from typing import TYPE_CHECKING, Any, Optional, Tuple, Union
 
+from deepseek_browser.blocking import BlockingProfile, RequestBlocker, resolve_blocking
+from deepseek_browser.checkpoint import Checkpoint, CheckpointStore, checkpoint_from_agent
+from deepseek_browser.deadline import DeadlineExceeded, DeadlineGuard
+from deepseek_browser.llm_cache import LLMResponseCache
+from deepseek_browser.llm_pool import OllamaEndpoint, OllamaEndpointPool
 from deepseek_browser.monitoring import Monitor
+from deepseek_browser.pool import BrowserSessionPool
+from deepseek_browser.retry import (
+    DEFAULT_RETRY_POLICIES,
+    LLM_UNAVAILABLE,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    classify_error,
+)
+from deepseek_browser.storage_state import StorageStateStore, filter_storage_state, task_domain
+from deepseek_browser.tracing import StepTracer, llm_callback_handler
+
+if TYPE_CHECKING:  # pragma: no cover
+    from browser_use import Agent, BrowserProfile, BrowserSession
+    from browser_use.agent.views import AgentState
+    from langchain_ollama import ChatOllama
+
+# browser_use and langchain_ollama take most of the import time, so they are
+# only imported once an agent is created. Module attribute access, including
+# ``monkeypatch.setattr("ollama_config.Agent", ...)``, loads them on demand.
+_LAZY_IMPORTS = {
+    "Agent": ("browser_use", "Agent"),
+    "BrowserProfile": ("browser_use", "BrowserProfile"),
+    "BrowserSession": ("browser_use", "BrowserSession"),
+    "setup_logging": ("browser_use.logging_config", "setup_logging"),
+    "AgentState": ("browser_use.agent.views", "AgentState"),
+    "ChatOllama": ("langchain_ollama", "ChatOllama"),
+}
+
+_logging_configured = False
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attr = _LAZY_IMPORTS[name]
+    value = getattr(importlib.import_module(module), attr)
+    globals()[name] = value
+    return value
+
+
+def _load_dependencies() -> None:
+    """Import the lazily loaded names, keeping any that were already set."""
+    for name in _LAZY_IMPORTS:
+        if name not in globals():
+            __getattr__(name)
+
+
+def _chain_hooks(hooks: list) -> Any:
+    """Combine ``browser_use`` step hooks into one."""
+    if len(hooks) == 1:
+        return hooks[0]
+
+    async def hook(agent: Any) -> None:
+        for h in hooks:
+            await h(agent)
+
+    return hook
+
+
+def configure_logging() -> None:
+    """Run ``browser_use`` logging setup once per process."""
+    global _logging_configured
+    if not _logging_configured:
+        _load_dependencies()
+        setup_logging()
+        _logging_configured = True
 
 
 @dataclass
@@ -19,6 +92,7 @@ class BrowserAgentConfig:
 
     model_name: str = "deepseek"  # default model
     ollama_url: str = "http://localhost:11434"  # local ollama server
+    ollama_urls: list[str] = field(default_factory=list)  # several servers, balanced
     temperature: float = 0.2
     headless: bool = True
     viewport: Optional[Tuple[int, int]] = None
@@ -27,6 +101,32 @@ class BrowserAgentConfig:
     browser_args: list[str] = field(default_factory=list)
     browser_options: dict[str, Any] = field(default_factory=dict)
     retries: int = 1
+    retry_policies: dict[str, RetryPolicy] = field(default_factory=dict)  # per failure class
+    breaker_threshold: int = 5  # consecutive LLM failures opening the circuit
+    breaker_reset: float = 30.0  # seconds before a trial call is allowed
+    pool_size: int = 1
+    trace_steps: bool = False
+    warm_up: bool = False  # preload the model and browser in create_agent
+    keep_alive: Optional[Union[int, str]] = None  # how long Ollama keeps the model loaded
+    llm_cache_path: Optional[str] = None  # enables the LLM response cache
+    llm_cache_size: int = 10_000
+    llm_replay: bool = False  # fail on prompts missing from the cache
+    standby_session: bool = False  # keep a spare browser running for recovery
+    checkpoint_path: Optional[str] = None  # SQLite file for per-step checkpoints
+    checkpoint_max_age: Optional[float] = 7 * 86400  # seconds an unfinished run stays resumable
+    block_resources: Optional[Union[str, BlockingProfile]] = None  # preset name or profile
+    template_blocking: dict[str, Union[str, BlockingProfile]] = field(default_factory=dict)
+    storage_state_dir: Optional[str] = None  # per-domain cookies and local storage
+    storage_state_max_age: Optional[float] = 7 * 86400  # seconds a saved state stays valid
+    storage_state_max_entries: int = 100  # domains kept on disk
+
+    def __post_init__(self) -> None:
+        # Presets become profiles, so a typo fails here and a preset
+        # fingerprints like the equal profile in the result cache
+        self.block_resources = resolve_blocking(self.block_resources)
+        self.template_blocking = {
+            name: resolve_blocking(value) for name, value in self.template_blocking.items()
+        }
 
 
 class BrowserAgent:
@@ -42,11 +142,34 @@ class BrowserAgent:
         monitor: Optional[Monitor] = None,
     ) -> None:
         self.config = config or BrowserAgentConfig()
-        setup_logging()
         self.logger = logging.getLogger(self.__class__.__name__)
         self.llm: Optional[ChatOllama] = None
         self.browser_session: Optional[BrowserSession] = None
+        self.pool: Optional[BrowserSessionPool] = None
+        self.llm_pool: Optional[OllamaEndpointPool] = None
         self.monitor = monitor
+        self._models_warm = False
+        self.llm_cache: Optional[LLMResponseCache] = None
+        self._standby: Optional[asyncio.Future] = None
+        self.breaker = CircuitBreaker(self.config.breaker_threshold, self.config.breaker_reset)
+        self._step_seconds: Optional[float] = None
+        self.checkpoints: Optional[CheckpointStore] = None
+        self._blocking = resolve_blocking(self.config.block_resources)
+        self._template_blocking = {
+            name: resolve_blocking(value) for name, value in self.config.template_blocking.items()
+        }
+        self._blockers: dict[int, RequestBlocker] = {}
+        self.storage_states: Optional[StorageStateStore] = None
+        if self.config.storage_state_dir is not None:
+            self.storage_states = StorageStateStore(
+                self.config.storage_state_dir,
+                max_age=self.config.storage_state_max_age,
+                max_entries=self.config.storage_state_max_entries,
+            )
+        # Domains whose saved state is already loaded, by session id
+        self._restored: dict[int, set[str]] = {}
+        # Tasks currently using the single shared session, by session id
+        self._session_users: dict[int, int] = {}
 
     async def _cleanup_session(self) -> None:
         if self.browser_session is not None:
@@ -75,74 +198,514 @@ class BrowserAgent:
         )
         return profile
 
+    def _create_llm(self, base_url: str, cached: bool = True) -> ChatOllama:
+        self.logger.info("Creating ChatOllama with model %s at %s", self.config.model_name, base_url)
+        llm_options: dict[str, Any] = {}
+        if cached and self.config.llm_cache_path is not None:
+            if self.llm_cache is None:
+                self.llm_cache = LLMResponseCache(
+                    self.config.llm_cache_path,
+                    max_entries=self.config.llm_cache_size,
+                    strict=self.config.llm_replay,
+                    monitor=self.monitor,
+                )
+            llm_options["cache"] = self.llm_cache.langchain_cache()
+        if self.config.trace_steps:
+            llm_options["callbacks"] = [llm_callback_handler()]
+        if self.config.keep_alive is not None:
+            llm_options["keep_alive"] = self.config.keep_alive
+        return ChatOllama(
+            model=self.config.model_name,
+            base_url=base_url,
+            temperature=self.config.temperature,
+            **llm_options,
+        )
+
+    async def _start_session(self) -> BrowserSession:
+        start = time.perf_counter()
+        session = BrowserSession(browser_profile=self._build_profile())
+        await session.start()
+        self.logger.info(
+            "Browser session started (%s)",
+            "headless" if self.config.headless else "visible",
+        )
+        if self._blocking is not None or self._template_blocking:
+            await self._install_blocker(session)
+        self._restored[id(session)] = set()
+        if self.config.warm_up:
+            error = None
+            try:
+                # Spin up a renderer so the first task does not pay for it
+                await session.navigate_to("about:blank")
+            except Exception as exc:
+                error = str(exc)
+                self.logger.warning("Browser warm-up failed: %s", exc)
+            if self.monitor:
+                self.monitor.record_warmup("browser", time.perf_counter() - start, error=error)
+        return session
+
+    async def _install_blocker(self, session: BrowserSession) -> None:
+        context = getattr(session, "browser_context", None)
+        if context is None:
+            self.logger.warning("Browser session has no context, requests are not blocked")
+            return
+        blocker = RequestBlocker(self._blocking, self.monitor)
+        await blocker.install(context)
+        # Keyed by id: sessions are not hashable. A new session reusing the
+        # id of a dead one replaces its entry here.
+        self._blockers[id(session)] = blocker
+
+    def _apply_blocking(self, session: BrowserSession, template: Optional[str]) -> None:
+        blocker = self._blockers.get(id(session))
+        if blocker is not None:
+            blocker.profile = self._template_blocking.get(template, self._blocking)
+
+    async def _restore_storage(self, session: BrowserSession, domain: Optional[str]) -> None:
+        """Load the saved cookies and local storage of ``domain`` into ``session``."""
+        restored = self._restored.setdefault(id(session), set())
+        if self.storage_states is None or domain is None or domain in restored:
+            return
+        context = getattr(session, "browser_context", None)
+        if context is None:
+            return
+        restored.add(domain)
+        loop = asyncio.get_running_loop()
+        try:
+            state = await loop.run_in_executor(None, self.storage_states.load, domain)
+            if not state:
+                return
+            if state.get("cookies"):
+                await context.add_cookies(state["cookies"])
+            origins = {
+                o["origin"]: [[item["name"], item["value"]] for item in o.get("localStorage", [])]
+                for o in state.get("origins", [])
+            }
+            if any(origins.values()):
+                # Init scripts run on every navigation. Only fill keys that
+                # are missing, once per tab, so values the site rotates
+                # during the task are not overwritten with stale ones.
+                await context.add_init_script(
+                    "(o => { const items = o[location.origin]; const mark = '__restored_state__';"
+                    " if (!items || sessionStorage.getItem(mark)) return;"
+                    " sessionStorage.setItem(mark, '1');"
+                    " for (const [k, v] of items) if (localStorage.getItem(k) === null)"
+                    " localStorage.setItem(k, v); })"
+                    f"({json.dumps(origins)})"
+                )
+        except Exception as exc:
+            self.logger.warning("Could not restore storage state of %s: %s", domain, exc)
+            return
+        self.logger.info("Restored storage state of %s", domain)
+        if self.monitor:
+            self.monitor.increment("storage_states_restored")
+
+    async def _save_storage(self, session: BrowserSession, domain: Optional[str]) -> None:
+        if self.storage_states is None or domain is None:
+            return
+        context = getattr(session, "browser_context", None)
+        if context is None:
+            return
+        try:
+            state = filter_storage_state(await context.storage_state(), domain)
+            if not state["cookies"] and not state["origins"]:
+                return
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.storage_states.save, domain, state
+            )
+        except Exception as exc:
+            self.logger.warning("Could not save storage state of %s: %s", domain, exc)
+            return
+        if self.monitor:
+            self.monitor.increment("storage_states_saved")
+
+    async def _warm_up_model(self, llm: ChatOllama) -> None:
+        start = time.perf_counter()
+        error = None
+        if self.llm_cache is not None:
+            # A cached answer would not load anything
+            llm = self._create_llm(llm.base_url, cached=False)
+        try:
+            # A single generated token is enough to load the weights
+            await llm.ainvoke("Reply with OK.", options={"num_predict": 1})
+        except Exception as exc:
+            error = str(exc)
+            self.logger.warning("Model warm-up at %s failed: %s", llm.base_url, exc)
+        duration = time.perf_counter() - start
+        self.logger.info("Model warm-up at %s took %.2fs", llm.base_url, duration)
+        if self.monitor:
+            self.monitor.record_warmup("model", duration, target=llm.base_url, error=error)
+
+    async def _init_llm(self) -> None:
+        # Clients outlive browser sessions, so recovery never rebuilds them
+        if self.llm is not None:
+            return
+        urls = self.config.ollama_urls or [self.config.ollama_url]
+        if len(urls) > 1:
+            if self.llm_pool is None:
+                self.llm_pool = OllamaEndpointPool(urls, self._create_llm)
+                await self.llm_pool.start()
+            self.llm = self.llm_pool.endpoints[0].client
+        else:
+            self.llm = self._create_llm(urls[0])
+
+    def _launch_standby(self) -> None:
+        if self.config.standby_session and self._standby is None:
+            self._standby = asyncio.ensure_future(self._start_session())
+
+    async def _take_standby(self) -> Optional[BrowserSession]:
+        """Return the standby session if it started and is still connected."""
+        standby, self._standby = self._standby, None
+        if standby is None or standby.cancelled():
+            return None
+        try:
+            # A standby still launching is ahead of a fresh launch
+            session = await standby
+        except Exception as exc:
+            self.logger.warning("Standby browser session failed to start: %s", exc)
+            return None
+        if not session.is_connected():
+            await self._kill(session)
+            return None
+        self.logger.info("Switched to standby browser session")
+        if self.monitor:
+            self.monitor.increment("standby_sessions_used")
+        return session
+
+    async def _kill(self, session: BrowserSession) -> None:
+        try:
+            await session.kill()
+        except Exception as exc:
+            self.logger.warning("Error terminating browser session: %s", exc)
+
+    async def _close_standby(self) -> None:
+        standby, self._standby = self._standby, None
+        if standby is None:
+            return
+        standby.cancel()
+        results = await asyncio.gather(standby, return_exceptions=True)
+        if not isinstance(results[0], BaseException):
+            await self._kill(results[0])
+
     async def create_agent(self) -> None:
         """Initialize the LLM and browser session.
 
         This method sets up ``ChatOllama`` and launches a ``BrowserSession``
-        according to :class:`BrowserAgentConfig`.
+        according to :class:`BrowserAgentConfig`. With several
+        ``ollama_urls`` an :class:`OllamaEndpointPool` holds one client per
+        server. When ``pool_size`` is
+        greater than one a :class:`BrowserSessionPool` is started instead so
+        concurrent tasks each get their own browser.
+
+        With ``warm_up`` enabled the model is loaded by a one-token
+        generation while the browser starts, and every new session opens
+        ``about:blank``. Timings are reported to :meth:`Monitor.record_warmup`.
+
+        The LLM clients are created only once. Calling this again after a
+        browser failure only replaces the session, taking the standby session
+        when ``standby_session`` is enabled.
         """
+        configure_logging()
         try:
-            self.logger.info("Creating ChatOllama with model %s", self.config.model_name)
-            self.llm = ChatOllama(
-                model=self.config.model_name,
-                base_url=self.config.ollama_url,
-                temperature=self.config.temperature,
-            )
+            await self._init_llm()
 
-            profile = self._build_profile()
-            self.browser_session = BrowserSession(browser_profile=profile)
-            await self.browser_session.start()
-            self.logger.info(
-                "Browser session started (%s)",
-                "headless" if self.config.headless else "visible",
-            )
+            warm_up = None
+            if self.config.warm_up and not self._models_warm:
+                llms = [e.client for e in self.llm_pool.endpoints] if self.llm_pool else [self.llm]
+                # Load the model while the browser launches
+                warm_up = asyncio.ensure_future(
+                    asyncio.gather(*(self._warm_up_model(llm) for llm in llms))
+                )
+            try:
+                if self.config.pool_size > 1:
+                    if self.pool is None:
+                        self.pool = BrowserSessionPool(self._start_session, self.config.pool_size)
+                        await self.pool.start()
+                else:
+                    self.browser_session = await self._take_standby()
+                    if self.browser_session is None:
+                        self.browser_session = await self._start_session()
+                    self._launch_standby()
+            except BaseException:
+                if warm_up is not None:
+                    warm_up.cancel()
+                raise
+            finally:
+                if warm_up is not None:
+                    await asyncio.gather(warm_up, return_exceptions=True)
+                    # A cancelled warm-up is retried by the next create_agent
+                    self._models_warm = not warm_up.cancelled()
         except Exception as exc:
             self.logger.exception("Failed to create agent: %s", exc)
             raise
 
-    async def run_task(self, task_description: str, task_id: Optional[int] = None):
+    async def _checkout_session(self, domain: Optional[str] = None) -> BrowserSession:
+        if self.config.pool_size > 1:
+            if self.pool is None or self.llm is None:
+                await self.create_agent()
+            assert self.pool is not None
+            return await self.pool.acquire(domain)
+        if self.browser_session is None or self.llm is None or not self.browser_session.is_connected():
+            await self._cleanup_session()
+            await self.create_agent()
+        assert self.browser_session is not None
+        key = id(self.browser_session)
+        self._session_users[key] = self._session_users.get(key, 0) + 1
+        return self.browser_session
+
+    def _owns_session(self, session: BrowserSession) -> bool:
+        """Whether no other task is using ``session`` right now."""
+        return self.pool is not None or self._session_users.get(id(session), 0) <= 1
+
+    async def _checkin_session(
+        self, session: BrowserSession, discard: bool = False, domain: Optional[str] = None
+    ) -> None:
+        if discard:
+            self._restored.pop(id(session), None)
+        if self.pool is None:
+            users = self._session_users.pop(id(session), 0) - 1
+            if users > 0:
+                self._session_users[id(session)] = users
+        if self.pool is not None:
+            await self.pool.release(session, discard=discard, key=domain)
+        elif discard:
+            # The shared session may already have been replaced, e.g. by the
+            # standby; never kill the replacement
+            if session is self.browser_session:
+                self.browser_session = None
+            await self._kill(session)
+
+    def _retry_policy(self, failure: str) -> RetryPolicy:
+        return self.config.retry_policies.get(failure) or DEFAULT_RETRY_POLICIES[failure]
+
+    def _checkpoint_store(self) -> Optional[CheckpointStore]:
+        # Opened on first use, so an agent reopened after close() keeps
+        # checkpointing
+        if self.checkpoints is None and self.config.checkpoint_path is not None:
+            self.checkpoints = CheckpointStore(
+                self.config.checkpoint_path, max_age=self.config.checkpoint_max_age
+            )
+        return self.checkpoints
+
+    async def load_checkpoint(self, run_id: str) -> Optional[Checkpoint]:
+        """Return the saved progress of ``run_id``, if checkpointing is on."""
+        store = self._checkpoint_store()
+        if store is None:
+            return None
+        return await asyncio.get_running_loop().run_in_executor(None, store.load, run_id)
+
+    def _checkpoint_hook(self, run_id: str, description: str):
+        async def on_step_end(agent: Any) -> None:
+            checkpoint = checkpoint_from_agent(run_id, description, agent)
+            store = self._checkpoint_store()
+            if checkpoint is not None and store is not None:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, store.save, checkpoint)
+
+        return on_step_end
+
+    async def _resume_options(self, run_id: str) -> dict[str, Any]:
+        checkpoint = await self.load_checkpoint(run_id)
+        if checkpoint is None:
+            return {}
+        self.logger.info("Resuming run %s after step %s", run_id, checkpoint.step)
+        options: dict[str, Any] = {
+            "injected_agent_state": AgentState.model_validate_json(checkpoint.state)
+        }
+        if checkpoint.url:
+            # The new session starts where the last completed step left off
+            options["initial_actions"] = [{"go_to_url": {"url": checkpoint.url}}]
+        return options
+
+    async def run_task(
+        self,
+        task_description: str,
+        task_id: Optional[int] = None,
+        resume: bool = False,
+        deadline: Optional[float] = None,
+        template: Optional[str] = None,
+        run_id: Optional[str] = None,
+    ):
         """Run a task description through the agent with retry support.
 
+        Failures are classified with :func:`classify_error` and retried
+        according to the :class:`RetryPolicy` of their class. Only session
+        crashes replace the browser. While Ollama keeps failing the circuit
+        breaker rejects attempts with :class:`CircuitOpenError` without
+        touching the browser.
+
+        With ``checkpoint_path`` configured and a ``run_id`` given, the agent
+        state and current URL are saved after every step. Retries, and runs
+        with ``resume=True``, continue from the last saved step instead of
+        starting over.
+
         Parameters
         ----------
         task_description:
             Natural language instruction to execute in the browser.
+        task_id:
+            Identifier used for metrics and checkpoints.
+        resume:
+            Continue from the checkpoint of ``run_id`` if there is one.
+        deadline:
+            Event loop time by which the run must end. The agent's
+            ``max_steps`` is derived from the time left, and the agent is
+            stopped between steps with :class:`DeadlineExceeded` once the
+            next step would overrun.
+        template:
+            Name of the template the task was rendered from. Selects the
+            ``template_blocking`` profile over ``block_resources``.
+        run_id:
+            Identifier of this run that is unique across processes. Used to
+            key checkpoints.
+
+        If the run is cancelled the agent is stopped and its browser session
+        discarded, so no half-finished page state reaches the next task.
 
         Returns
         -------
         list
             Interaction history returned by ``browser_use.Agent``.
         """
+        checkpointing = run_id is not None and self._checkpoint_store() is not None
+        domain = task_domain(task_description) if self.storage_states is not None else None
         attempts = 0
-        while attempts <= self.config.retries:
-            if self.browser_session is None or self.llm is None or not self.browser_session.is_connected():
-                await self._cleanup_session()
-                await self.create_agent()
-            assert self.browser_session is not None and self.llm is not None
-            agent = Agent(
-                task=task_description,
-                llm=self.llm,
-                browser_session=self.browser_session,
-            )
+        while True:
+            try:
+                self.breaker.check()
+            except CircuitOpenError:
+                if self.monitor:
+                    self.monitor.increment("circuit_open_rejections")
+                raise
+            session: Optional[BrowserSession] = await self._checkout_session(domain)
+            assert self.llm is not None
+            self._apply_blocking(session, template)
+            if self.monitor and task_id is not None:
+                self.monitor.track_browser(task_id, getattr(session, "browser_pid", None))
+            endpoint: Optional[OllamaEndpoint] = None
+            if self.llm_pool is not None:
+                endpoint = self.llm_pool.acquire()
+            backoff = 0.0
+            start = time.perf_counter()
+            agent = None
             try:
+                await self._restore_storage(session, domain)
+                options = await self._resume_options(run_id) if checkpointing and resume else {}
+                agent = Agent(
+                    task=task_description,
+                    llm=endpoint.client if endpoint else self.llm,
+                    browser_session=session,
+                    **options,
+                )
+                step_start: list = []
+                step_end: list = []
+                tracer: Optional[StepTracer] = None
+                if self.config.trace_steps and task_id is not None:
+                    tracer = StepTracer(task_id, self.monitor)
+                    step_start.append(tracer.on_step_start)
+                    step_end.append(tracer.on_step_end)
+                if checkpointing:
+                    step_end.append(self._checkpoint_hook(run_id, task_description))
+                guard: Optional[DeadlineGuard] = None
+                run_options: dict[str, Any] = {}
+                if deadline is not None:
+                    guard = DeadlineGuard(deadline, self._step_seconds)
+                    step_start.append(guard.on_step_start)
+                    max_steps = guard.max_steps()
+                    if max_steps is not None:
+                        run_options["max_steps"] = max_steps
+                if step_start:
+                    run_options["on_step_start"] = _chain_hooks(step_start)
+                if step_end:
+                    run_options["on_step_end"] = _chain_hooks(step_end)
                 self.logger.info("Running task: %s (attempt %s)", task_description, attempts + 1)
-                start = time.perf_counter()
-                history = await agent.run()
+                if tracer is not None:
+                    with tracer.activate():
+                        history = await agent.run(**run_options)
+                else:
+                    history = await agent.run(**run_options)
+                if guard is not None:
+                    self._step_seconds = guard.step_seconds
+                    if guard.expired:
+                        raise DeadlineExceeded("Deadline reached, agent stopped between steps")
                 duration = time.perf_counter() - start
+                if checkpointing:
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, self.checkpoints.delete, run_id
+                    )
+                await self._save_storage(session, domain)
+                self.breaker.record_success()
                 if self.monitor and task_id is not None:
                     self.monitor.record_model_call(task_id=task_id, duration=duration)
                 self.logger.info("Task finished")
+                if endpoint is not None:
+                    self.llm_pool.release(endpoint)
+                    endpoint = None
                 return history
+            except DeadlineExceeded:
+                # Stopped cleanly between steps; no time is left for a retry
+                self.logger.warning("Task stopped at its deadline")
+                raise
+            except asyncio.CancelledError:
+                if agent is not None:
+                    agent.stop()
+                # A session other tasks are still using must stay up
+                if session is not None and self._owns_session(session):
+                    self.logger.warning("Task cancelled, discarding its browser session")
+                    await self._checkin_session(session, discard=True)
+                    session = None
+                else:
+                    self.logger.warning("Task cancelled, browser session is shared and kept")
+                raise
             except Exception as exc:
                 attempts += 1
-                self.logger.exception("Agent run failed: %s", exc)
-                await self._cleanup_session()
-                if attempts > self.config.retries:
+                failure = classify_error(exc, session)
+                policy = self._retry_policy(failure)
+                llm_failed = failure == LLM_UNAVAILABLE
+                if llm_failed:
+                    # Other failures say nothing about Ollama either way
+                    self.breaker.record_failure()
+                if endpoint is not None:
+                    # Browser failures say nothing about the Ollama server
+                    self.llm_pool.release(endpoint, ok=not llm_failed)
+                    endpoint = None
+                self.logger.exception("Agent run failed (%s): %s", failure, exc)
+                if self.monitor:
+                    self.monitor.increment(f"failures_{failure}")
+                    if task_id is not None:
+                        self.monitor.record_model_call(
+                            task_id=task_id,
+                            duration=time.perf_counter() - start,
+                            status="failed",
+                        )
+                # Other tasks may still be running on a shared session
+                if policy.discard_session and self._owns_session(session):
+                    await self._checkin_session(session, discard=True)
+                    session = None
+                limit = self.config.retries if policy.max_retries is None else policy.max_retries
+                if attempts > limit:
                     raise
-                self.logger.info("Retrying task...")
+                if self.monitor:
+                    self.monitor.increment("retries")
+                backoff = policy.delay(attempts)
+                resume = checkpointing
+                self.logger.info("Retrying task after %s in %.2fs", failure, backoff)
+            finally:
+                if endpoint is not None:
+                    self.llm_pool.release(endpoint)
+                if session is not None:
+                    await self._checkin_session(session, domain=domain)
+            if backoff:
+                await asyncio.sleep(backoff)
 
     async def close(self) -> None:
         """Close the browser session and clean up."""
+        await self._close_standby()
+        if self.llm_pool is not None:
+            llm_pool, self.llm_pool = self.llm_pool, None
+            await llm_pool.close()
+        if self.pool is not None:
+            pool, self.pool = self.pool, None
+            await pool.close()
         if self.browser_session is not None:
             try:
                 await self.browser_session.stop()
@@ -151,6 +714,18 @@ class BrowserAgent:
                 self.logger.warning("Error closing browser session: %s", exc)
             finally:
                 await self._cleanup_session()
+        self.llm = None
+        # The next create_agent builds new, cold clients
+        self._models_warm = False
+        self._blockers.clear()
+        self._restored.clear()
+        self._session_users.clear()
+        if self.checkpoints is not None:
+            self.checkpoints.close()
+            self.checkpoints = None
+        if self.llm_cache is not None:
+            self.llm_cache.close()
+            self.llm_cache = None
 
     async def __aenter__(self) -> "BrowserAgent":
         """Context manager entry, calls :meth:`create_agent`."""
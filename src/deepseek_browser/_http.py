@@ -0,0 +1,83 @@
+"""Minimal asyncio HTTP/1.1 server used by the metrics exporter and test servers."""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+Response = Tuple[int, Dict[str, str], bytes]
+Handler = Callable[[str, str, Dict[str, str], bytes], Awaitable[Response]]
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class HTTPServer:
+    """Serve requests with ``handler(method, path, headers, body)``.
+
+    Each connection handles a single request and is then closed, which keeps
+    the implementation small while being enough for scrapers and test clients.
+    """
+
+    def __init__(self, handler: Handler, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.logger.info("Listening on %s", self.url)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2:
+                await self._respond(writer, (400, {}, b""))
+                return
+            method, path = parts[0], parts[1]
+            headers: Dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                length = int(headers.get("content-length", 0) or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                await self._respond(writer, (400, {}, b""))
+                return
+            body = await reader.readexactly(length) if length else b""
+            try:
+                response = await self.handler(method, path, headers, body)
+            except Exception as exc:
+                self.logger.exception("Error handling %s %s: %s", method, path, exc)
+                response = (500, {}, b"")
+            await self._respond(writer, response)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, response: Response) -> None:
+        status, headers, body = response
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+        headers = {"Content-Length": str(len(body)), "Connection": "close", **headers}
+        lines.extend(f"{k}: {v}" for k, v in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
@@ -0,0 +1,125 @@
+import logging
+import urllib.parse
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Optional, Union
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .monitoring import Monitor
+
+# Hosts serving analytics, ads and tag managers. Subdomains are matched too.
+TRACKER_DOMAINS: FrozenSet[str] = frozenset(
+    {
+        "google-analytics.com",
+        "googletagmanager.com",
+        "googlesyndication.com",
+        "doubleclick.net",
+        "adservice.google.com",
+        "facebook.net",
+        "connect.facebook.net",
+        "scorecardresearch.com",
+        "hotjar.com",
+        "segment.io",
+        "mixpanel.com",
+        "taboola.com",
+        "outbrain.com",
+        "criteo.com",
+        "amazon-adsystem.com",
+        "adnxs.com",
+        "quantserve.com",
+        "chartbeat.com",
+    }
+)
+
+# Rough median transfer size per resource type. Blocked requests never get
+# a response, so the bytes they would have cost can only be estimated.
+TYPICAL_BYTES: Dict[str, int] = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 30_000,
+    "stylesheet": 20_000,
+    "script": 25_000,
+}
+_DEFAULT_BYTES = 5_000
+
+
+@dataclass(frozen=True)
+class BlockingProfile:
+    """Requests to abort before they reach the network.
+
+    ``resource_types`` are Playwright resource types such as ``"image"`` or
+    ``"font"``. ``domains`` block every request to those hosts and their
+    subdomains, whatever the type. Documents are never blocked by type.
+    """
+
+    resource_types: FrozenSet[str] = frozenset()
+    domains: FrozenSet[str] = frozenset()
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.resource_types and resource_type != "document":
+            return True
+        if not self.domains:
+            return False
+        host = (urllib.parse.urlsplit(url).hostname or "").lower()
+        while host:
+            if host in self.domains:
+                return True
+            host = host.partition(".")[2]
+        return False
+
+
+_MEDIA = frozenset({"image", "media", "font"})
+
+BLOCKING_PRESETS: Dict[str, BlockingProfile] = {
+    "none": BlockingProfile(),
+    "trackers": BlockingProfile(domains=TRACKER_DOMAINS),
+    # Pages still lay out normally, without the heavy assets
+    "media": BlockingProfile(resource_types=_MEDIA, domains=TRACKER_DOMAINS),
+    # Text extraction only; unstyled pages may change which elements look visible
+    "text": BlockingProfile(resource_types=_MEDIA | {"stylesheet"}, domains=TRACKER_DOMAINS),
+}
+
+
+def resolve_blocking(value: Union[str, BlockingProfile, None]) -> Optional[BlockingProfile]:
+    """Return the profile for a preset name, or ``value`` itself."""
+    if value is None or isinstance(value, BlockingProfile):
+        return value
+    try:
+        return BLOCKING_PRESETS[value]
+    except KeyError:
+        raise ValueError(
+            f"Unknown blocking preset {value!r}, expected one of {', '.join(BLOCKING_PRESETS)}"
+        ) from None
+
+
+class RequestBlocker:
+    """Playwright route handler aborting requests matched by :attr:`profile`.
+
+    One blocker is installed per browser context. :attr:`profile` may be
+    swapped between tasks, so a per-template override does not need a new
+    browser. Blocked requests are counted in ``blocked_requests`` and their
+    estimated size in ``blocked_bytes_estimate``.
+    """
+
+    def __init__(self, profile: Optional[BlockingProfile] = None, monitor: Optional["Monitor"] = None) -> None:
+        self.profile = profile
+        self.monitor = monitor
+        self.blocked = 0
+        self.bytes_saved = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    async def install(self, context: Any) -> None:
+        await context.route("**/*", self.handle)
+
+    async def handle(self, route: Any) -> None:
+        request = route.request
+        resource_type = request.resource_type
+        if self.profile is None or not self.profile.blocks(resource_type, request.url):
+            await route.continue_()
+            return
+        size = TYPICAL_BYTES.get(resource_type, _DEFAULT_BYTES)
+        self.blocked += 1
+        self.bytes_saved += size
+        if self.monitor:
+            self.monitor.increment("blocked_requests")
+            self.monitor.increment("blocked_bytes_estimate", size)
+        await route.abort("blockedbyclient")
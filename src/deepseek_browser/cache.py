@@ -0,0 +1,153 @@
+import hashlib
+import json
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, is_dataclass
+from typing import Any, Optional
+
+
+def normalize_description(description: str) -> str:
+    """Collapse whitespace so trivially different descriptions share a key."""
+    return " ".join(description.split())
+
+
+def _canonical(value: Any) -> Any:
+    # Set iteration order depends on the hash seed, which changes per process
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+def config_fingerprint(config: Any) -> str:
+    """Return a stable hash of an agent configuration."""
+    if config is None:
+        return ""
+    data = asdict(config) if is_dataclass(config) else vars(config)
+    payload = json.dumps(data, sort_keys=True, default=_canonical)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cache_key(description: str, config: Any = None, idempotency_key: Optional[str] = None) -> str:
+    """Build the cache key for a task.
+
+    A caller supplied ``idempotency_key`` takes precedence over the
+    description and configuration.
+    """
+    if idempotency_key is not None:
+        parts = ["idempotency", idempotency_key]
+    else:
+        parts = [
+            normalize_description(description),
+            getattr(config, "model_name", ""),
+            config_fingerprint(config),
+        ]
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+
+class ResultCache:
+    """SQLite-backed cache of task histories with TTL and LRU eviction.
+
+    Parameters
+    ----------
+    path:
+        Database file. The default ``":memory:"`` keeps entries for the life
+        of the process only.
+    ttl:
+        Seconds an entry stays valid. ``None`` disables expiry.
+    max_entries:
+        Maximum number of entries; the least recently used are evicted first.
+
+    Methods may be called from worker threads.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        ttl: Optional[float] = 3600,
+        max_entries: int = 1000,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for ``key`` or ``default``."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return default
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self.delete(key)
+                return default
+            self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return pickle.loads(value)
+
+    def put(self, key: str, value: Any) -> None:
+        """Store ``value`` under ``key``, evicting old entries if needed."""
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as exc:
+            self.logger.warning("Result for %s is not cacheable: %s", key, exc)
+            return
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, blob, expires_at, now),
+            )
+            self._conn.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Remove expired entries and return how many were deleted."""
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM results WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            self._conn.commit()
+        return cur.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,112 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass
+class Checkpoint:
+    """Agent progress after the last completed step of a task.
+
+    ``run_id`` is the task's :attr:`Task.run_id`, unique across processes.
+    ``state`` is the JSON serialized ``browser_use`` agent state, including
+    its history. ``url`` is the page the agent was on.
+    """
+
+    run_id: str
+    description: str
+    step: int
+    state: str
+    url: Optional[str] = None
+    updated_at: float = 0.0
+
+
+class CheckpointStore:
+    """SQLite table holding the latest :class:`Checkpoint` of each task.
+
+    All methods may be called from worker threads, so writes of large
+    histories do not block the event loop. Checkpoints of runs that were
+    never resumed are purged on open once older than ``max_age`` seconds,
+    and expired ones are not loaded.
+    """
+
+    def __init__(self, path: str = ":memory:", max_age: Optional[float] = 7 * 86400) -> None:
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "run_id TEXT PRIMARY KEY, description TEXT NOT NULL, step INTEGER NOT NULL, "
+            "url TEXT, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self.purge()
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        checkpoint.updated_at = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints "
+                "(run_id, description, step, url, state, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    checkpoint.run_id,
+                    checkpoint.description,
+                    checkpoint.step,
+                    checkpoint.url,
+                    checkpoint.state,
+                    checkpoint.updated_at,
+                ),
+            )
+            self._conn.commit()
+
+    def load(self, run_id: str) -> Optional[Checkpoint]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id, description, step, state, url, updated_at "
+                "FROM checkpoints WHERE run_id = ?",
+                (run_id,),
+            ).fetchone()
+        if row is None or self._expired(row[5]):
+            return None
+        return Checkpoint(*row)
+
+    def delete(self, run_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+            self._conn.commit()
+
+    def purge(self) -> int:
+        """Delete expired checkpoints and return how many were removed."""
+        if self.max_age is None:
+            return 0
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM checkpoints WHERE updated_at < ?", (time.time() - self.max_age,)
+            ).rowcount
+            self._conn.commit()
+        return removed
+
+    def _expired(self, updated_at: float) -> bool:
+        return self.max_age is not None and time.time() - updated_at > self.max_age
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def checkpoint_from_agent(run_id: str, description: str, agent: Any) -> Optional[Checkpoint]:
+    """Build a checkpoint from a ``browser_use`` agent after a step."""
+    state = getattr(agent, "state", None)
+    if state is None or not hasattr(state, "model_dump_json"):
+        return None
+    history = getattr(getattr(state, "history", None), "history", None) or []
+    url = getattr(getattr(history[-1], "state", None), "url", None) if history else None
+    return Checkpoint(
+        run_id=run_id,
+        description=description,
+        step=getattr(state, "n_steps", len(history)),
+        state=state.model_dump_json(),
+        url=url,
+    )
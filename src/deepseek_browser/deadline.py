@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Optional
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The agent was stopped at a step boundary because its deadline was near."""
+
+
+class DeadlineGuard:
+    """Fit an agent run into the time left before ``deadline``.
+
+    ``deadline`` is an event loop time. The guard limits ``max_steps`` from
+    the expected step duration and, as an ``on_step_start`` hook, stops the
+    agent once the next step would no longer finish in time. Stopping at a
+    step boundary leaves the browser in a usable state, unlike the hard
+    cancellation of ``asyncio.wait_for``.
+
+    Parameters
+    ----------
+    deadline:
+        ``loop.time()`` by which the run must be over.
+    step_seconds:
+        Expected duration of one step, if known from earlier runs. It is
+        refined with every step observed.
+    """
+
+    # Weight of the newest observation in the running step estimate
+    SMOOTHING = 0.3
+
+    def __init__(self, deadline: float, step_seconds: Optional[float] = None) -> None:
+        self.deadline = deadline
+        self.step_seconds = step_seconds
+        self.expired = False
+        self._last_start: Optional[float] = None
+
+    def remaining(self) -> float:
+        return self.deadline - asyncio.get_running_loop().time()
+
+    def max_steps(self, limit: int = 100) -> Optional[int]:
+        """Return how many steps fit in the remaining time, if estimable."""
+        if not self.step_seconds:
+            return None
+        return max(1, min(limit, int(self.remaining() // self.step_seconds)))
+
+    def _observe(self, seconds: float) -> None:
+        if self.step_seconds is None:
+            self.step_seconds = seconds
+        else:
+            self.step_seconds += self.SMOOTHING * (seconds - self.step_seconds)
+
+    async def on_step_start(self, agent: Any) -> None:
+        now = asyncio.get_running_loop().time()
+        if self._last_start is not None:
+            self._observe(now - self._last_start)
+        self._last_start = now
+        if self.step_seconds and now + self.step_seconds > self.deadline:
+            self.expired = True
+            agent.stop()
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import threading
+from typing import TYPE_CHECKING, Any, Optional
+
+from .cache import ResultCache
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .monitoring import Monitor
+
+
+class ReplayMiss(LookupError):
+    """Raised in strict replay mode when a prompt has no recorded response."""
+
+
+def llm_cache_key(prompt: str, llm_string: str) -> str:
+    """Hash a serialized prompt together with the model and its parameters."""
+    return hashlib.sha256(json.dumps([llm_string, prompt]).encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """Content-addressed cache of chat model responses.
+
+    Entries are keyed on :func:`llm_cache_key`, so a response is only reused
+    for the same model, parameters and messages. Responses are kept in a
+    :class:`ResultCache` without expiry and evicted least recently used
+    first once ``max_entries`` is reached.
+
+    Parameters
+    ----------
+    path:
+        SQLite database holding the responses. Use a file to share them
+        between runs.
+    max_entries:
+        Maximum number of stored responses.
+    strict:
+        Replay mode. A prompt without a stored response raises
+        :class:`ReplayMiss` instead of reaching the model, and nothing new
+        is stored.
+    monitor:
+        Receives ``llm_cache_hits`` and ``llm_cache_misses`` counters.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        max_entries: int = 10_000,
+        strict: bool = False,
+        monitor: Optional["Monitor"] = None,
+    ) -> None:
+        self.store = ResultCache(path, ttl=None, max_entries=max_entries)
+        self.strict = strict
+        self.monitor = monitor
+        self._lock = threading.Lock()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Any]:
+        key = llm_cache_key(prompt, llm_string)
+        with self._lock:
+            value = self.store.get(key)
+        if self.monitor:
+            self.monitor.increment("llm_cache_hits" if value is not None else "llm_cache_misses")
+        if value is None and self.strict:
+            raise ReplayMiss(f"No recorded response for prompt {key[:12]}")
+        return value
+
+    def update(self, prompt: str, llm_string: str, value: Any) -> None:
+        if self.strict:
+            return
+        with self._lock:
+            self.store.put(llm_cache_key(prompt, llm_string), value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.store.clear()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def close(self) -> None:
+        self.store.close()
+
+    def langchain_cache(self) -> Any:
+        """Return a LangChain ``BaseCache`` to pass as ``ChatOllama(cache=...)``."""
+        return _adapter_class()(self)
+
+
+_cache_class = None
+
+
+def _adapter_class():
+    global _cache_class
+    if _cache_class is None:
+        from langchain_core.caches import BaseCache
+
+        # The async methods inherited from BaseCache run these in a worker
+        # thread, which matters because even a hit commits its access time.
+        class ResponseCacheAdapter(BaseCache):
+            def __init__(self, cache: LLMResponseCache) -> None:
+                self.cache = cache
+
+            def lookup(self, prompt, llm_string):
+                return self.cache.lookup(prompt, llm_string)
+
+            def update(self, prompt, llm_string, return_val):
+                self.cache.update(prompt, llm_string, return_val)
+
+            def clear(self, **kwargs):
+                self.cache.clear()
+
+        _cache_class = ResponseCacheAdapter
+    return _cache_class
@@ -0,0 +1,160 @@
+import asyncio
+import itertools
+import logging
+import time
+import urllib.request
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+
+@dataclass
+class OllamaEndpoint:
+    """An Ollama server and the LLM client shared by all tasks using it."""
+
+    url: str
+    client: Any
+    outstanding: int = 0
+    failures: int = 0
+    ejected_until: float = 0.0
+    last_latency: Optional[float] = None
+
+    @property
+    def ejected(self) -> bool:
+        return self.ejected_until > time.monotonic()
+
+
+def probe_endpoint(url: str, timeout: float) -> None:
+    """Raise if the Ollama server at ``url`` does not answer ``/api/tags``."""
+    with urllib.request.urlopen(url.rstrip("/") + "/api/tags", timeout=timeout) as resp:
+        resp.read()
+
+
+class OllamaEndpointPool:
+    """Balance LLM work across several Ollama servers.
+
+    Each endpoint gets one long-lived client, so HTTP connections are kept
+    alive and reused across tasks. :meth:`acquire` picks the healthy endpoint
+    with the fewest outstanding leases. Endpoints are ejected after
+    ``max_failures`` consecutive failures or when a health check fails or
+    takes longer than ``slow_threshold`` seconds. They are re-admitted by the
+    next successful health check, or after ``eject_seconds`` at the latest.
+
+    Parameters
+    ----------
+    urls:
+        Base URLs of the Ollama servers.
+    client_factory:
+        Callable building an LLM client for a base URL.
+    health_interval:
+        Seconds between background health checks.
+    probe:
+        Callable ``probe(url, timeout)`` raising on failure. It runs in a
+        worker thread. Defaults to :func:`probe_endpoint`.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        client_factory: Callable[[str], Any],
+        health_interval: float = 10.0,
+        max_failures: int = 3,
+        eject_seconds: float = 30.0,
+        slow_threshold: float = 5.0,
+        probe: Optional[Callable[[str, float], None]] = None,
+    ) -> None:
+        if not urls:
+            raise ValueError("At least one Ollama endpoint is required")
+        self.endpoints = [OllamaEndpoint(url=u, client=client_factory(u)) for u in urls]
+        self.health_interval = health_interval
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.slow_threshold = slow_threshold
+        self.probe = probe or probe_endpoint
+        self._order = itertools.count()
+        self._health_task: Optional[asyncio.Task] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def acquire(self) -> OllamaEndpoint:
+        """Lease the least loaded healthy endpoint.
+
+        When every endpoint is ejected the one due back first is used rather
+        than failing outright.
+        """
+        healthy = [e for e in self.endpoints if not e.ejected]
+        if healthy:
+            # Rotate the start so ties are spread round-robin
+            offset = next(self._order) % len(healthy)
+            rotated = healthy[offset:] + healthy[:offset]
+            endpoint = min(rotated, key=lambda e: e.outstanding)
+        else:
+            endpoint = min(self.endpoints, key=lambda e: e.ejected_until)
+        endpoint.outstanding += 1
+        return endpoint
+
+    def release(self, endpoint: OllamaEndpoint, ok: bool = True) -> None:
+        """Return a lease, recording whether the endpoint served it successfully."""
+        endpoint.outstanding -= 1
+        if ok:
+            endpoint.failures = 0
+            return
+        endpoint.failures += 1
+        if endpoint.failures >= self.max_failures:
+            self._eject(endpoint, f"{endpoint.failures} consecutive failures")
+
+    @contextmanager
+    def lease(self):
+        endpoint = self.acquire()
+        try:
+            yield endpoint
+        except Exception:
+            self.release(endpoint, ok=False)
+            raise
+        else:
+            self.release(endpoint)
+
+    def _eject(self, endpoint: OllamaEndpoint, reason: str) -> None:
+        if not endpoint.ejected:
+            self.logger.warning("Ejecting Ollama endpoint %s: %s", endpoint.url, reason)
+        endpoint.ejected_until = time.monotonic() + self.eject_seconds
+
+    def _check_endpoint(self, endpoint: OllamaEndpoint) -> None:
+        start = time.perf_counter()
+        try:
+            self.probe(endpoint.url, self.slow_threshold)
+        except Exception as exc:
+            self._eject(endpoint, f"health check failed: {exc}")
+            return
+        endpoint.last_latency = time.perf_counter() - start
+        if endpoint.last_latency > self.slow_threshold:
+            self._eject(endpoint, f"health check took {endpoint.last_latency:.1f}s")
+        elif endpoint.ejected_until:
+            self.logger.info("Ollama endpoint %s healthy again", endpoint.url)
+            endpoint.ejected_until = 0.0
+            endpoint.failures = 0
+
+    async def check(self) -> None:
+        """Probe every endpoint concurrently in worker threads."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(None, self._check_endpoint, e) for e in self.endpoints)
+        )
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.check()
+            except Exception as exc:
+                self.logger.warning("Ollama health check failed: %s", exc)
+
+    async def start(self) -> None:
+        """Start background health checks."""
+        if self._health_task is None:
+            self._health_task = asyncio.ensure_future(self._health_loop())
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
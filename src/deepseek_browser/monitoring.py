@@ -1,9 +1,21 @@
+import asyncio
 import json
 import logging
-import psutil
+import random
+import threading
+import time
+from collections import deque
 from dataclasses import dataclass, asdict
 from datetime import datetime
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, MutableSequence, Optional, Sequence, Tuple
+
+from .sketch import QuantileSketch
+from .tracing import StepSpan, spans_to_otel
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .prometheus import PrometheusExporter
+    from .resources import ResourceSampler
+    from .sinks import MetricsSink
 
 
 @dataclass
@@ -13,39 +25,272 @@ class TaskMetric:
     status: str
     duration: float
     error: Optional[str] = None
+    template: Optional[str] = None
+    cpu_seconds: Optional[float] = None
+    peak_rss: Optional[int] = None
+    net_bytes: Optional[int] = None
+    resources_shared: bool = False  # cpu_seconds and peak_rss include another task
 
 
 @dataclass
 class ModelCallMetric:
     task_id: int
     duration: float
+    status: str = "success"
+
+
+@dataclass
+class QueueMetric:
+    task_id: int
+    wait_time: float
+    queue_depth: int
+
+
+@dataclass
+class WarmupMetric:
+    component: str
+    duration: float
+    target: Optional[str] = None
+    error: Optional[str] = None
 
 
 class Monitor:
-    """Collect execution and performance metrics."""
+    """Collect execution and performance metrics.
 
-    def __init__(self) -> None:
-        self.tasks: List[TaskMetric] = []
-        self.model_calls: List[ModelCallMetric] = []
+    Parameters
+    ----------
+    exporter:
+        Optional :class:`PrometheusExporter` updated as metrics are recorded.
+    retention:
+        When set, only the most recent ``retention`` entries of each metric
+        list are kept. Latency summaries in :meth:`summary` still cover every
+        recorded task and model call.
+    sinks:
+        :class:`MetricsSink` objects receiving every record. Records are
+        queued in memory and written in batches by a background task started
+        with :meth:`start`, so recording never touches the disk.
+    flush_interval:
+        Maximum number of seconds records wait before being flushed.
+    flush_size:
+        Number of queued records that triggers an early flush.
+    max_pending:
+        Upper bound on queued records; the oldest are dropped when sinks
+        cannot keep up.
+    sampler:
+        Optional :class:`ResourceSampler` attributing browser CPU, memory and
+        network use to tasks. Its results are stored on :class:`TaskMetric`.
+    """
+
+    def __init__(
+        self,
+        exporter: Optional["PrometheusExporter"] = None,
+        retention: Optional[int] = None,
+        sinks: Optional[Sequence["MetricsSink"]] = None,
+        flush_interval: float = 1.0,
+        flush_size: int = 500,
+        max_pending: int = 100_000,
+        sampler: Optional["ResourceSampler"] = None,
+    ) -> None:
+        self.retention = retention
+        self.sinks = list(sinks or [])
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._pending: deque = deque(maxlen=max_pending)
+        self._flush_wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._write_lock = threading.Lock()
+        self.tasks: MutableSequence[TaskMetric] = self._buffer()
+        self.model_calls: MutableSequence[ModelCallMetric] = self._buffer()
+        self.queue_waits: MutableSequence[QueueMetric] = self._buffer()
+        self.steps: MutableSequence[StepSpan] = self._buffer()
+        self.warmups: MutableSequence[WarmupMetric] = self._buffer()
+        self._trace_seed = random.getrandbits(64)
+        self.task_summaries: Dict[Tuple[str, Optional[str]], QuantileSketch] = {}
+        self.model_call_summaries: Dict[str, QuantileSketch] = {}
+        self.counters: Dict[str, int] = {}
+        self.exporter = exporter
+        self.sampler = sampler
+        self._running: Dict[int, Optional[str]] = {}
         self.logger = logging.getLogger(self.__class__.__name__)
 
+    def _buffer(self) -> MutableSequence:
+        return deque(maxlen=self.retention) if self.retention is not None else []
+
+    @staticmethod
+    def _observe(summaries: Dict, key, value: float) -> None:
+        sketch = summaries.get(key)
+        if sketch is None:
+            sketch = summaries[key] = QuantileSketch()
+        sketch.add(value)
+
+    def _emit(self, kind: str, metric) -> None:
+        if not self.sinks:
+            return
+        if len(self._pending) == self._pending.maxlen:
+            self.increment("metrics_dropped")
+        self._pending.append({"kind": kind, "recorded_at": time.time(), **asdict(metric)})
+        if self._flush_wakeup is not None and len(self._pending) >= self.flush_size:
+            self._flush_wakeup.set()
+
+    def track_browser(self, task_id: int, pid: Optional[int]) -> None:
+        """Attribute the browser process tree rooted at ``pid`` to ``task_id``."""
+        if self.sampler and pid is not None:
+            self.sampler.track(task_id, pid)
+
+    def record_task_start(self, task) -> None:
+        self._running[task.task_id] = getattr(task, "template", None)
+        if self.exporter:
+            self.exporter.set_in_flight(len(self._running))
+
     def record_task(self, task, duration: float) -> None:
-        self.tasks.append(
-            TaskMetric(
-                task_id=task.task_id,
-                description=task.description,
-                status=task.status,
-                duration=duration,
-                error=task.error,
-            )
+        template = getattr(task, "template", None)
+        metric = TaskMetric(
+            task_id=task.task_id,
+            description=task.description,
+            status=task.status,
+            duration=duration,
+            error=task.error,
+            template=template,
         )
+        usage = self.sampler.untrack(task.task_id) if self.sampler else None
+        if usage is not None:
+            metric.cpu_seconds = usage.cpu_seconds
+            metric.peak_rss = usage.peak_rss
+            metric.net_bytes = usage.net_bytes
+            metric.resources_shared = usage.shared
+        self.tasks.append(metric)
+        self._emit("task", metric)
+        self._observe(self.task_summaries, (task.status, template), duration)
+        self._running.pop(task.task_id, None)
+        if task.status == "timeout":
+            self.increment("task_timeouts")
+        elif task.status == "failed":
+            self.increment("task_failures")
+        elif task.status == "cancelled":
+            self.increment("task_cancellations")
+        if self.exporter:
+            self.exporter.observe_task(task.status, template, duration)
+            self.exporter.set_in_flight(len(self._running))
         self.logger.debug("Recorded task %s (%s)", task.task_id, task.status)
 
-    def record_model_call(self, task_id: int, duration: float) -> None:
-        self.model_calls.append(ModelCallMetric(task_id=task_id, duration=duration))
+    def record_model_call(self, task_id: int, duration: float, status: str = "success") -> None:
+        metric = ModelCallMetric(task_id=task_id, duration=duration, status=status)
+        self.model_calls.append(metric)
+        self._emit("model_call", metric)
+        self._observe(self.model_call_summaries, status, duration)
+        if self.exporter:
+            self.exporter.observe_model_call(status, self._running.get(task_id), duration)
         self.logger.debug("Recorded model call for task %s", task_id)
 
+    def record_queue_wait(self, task_id: int, wait_time: float, queue_depth: int) -> None:
+        metric = QueueMetric(task_id=task_id, wait_time=wait_time, queue_depth=queue_depth)
+        self.queue_waits.append(metric)
+        self._emit("queue_wait", metric)
+        self.logger.debug("Task %s waited %.3fs in queue", task_id, wait_time)
+
+    def record_warmup(
+        self,
+        component: str,
+        duration: float,
+        target: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Record how long preloading ``component`` (``model`` or ``browser``) took."""
+        metric = WarmupMetric(component=component, duration=duration, target=target, error=error)
+        self.warmups.append(metric)
+        self._emit("warmup", metric)
+        self.logger.debug("Warm-up of %s took %.3fs", component, duration)
+
+    def record_step(self, span: StepSpan) -> None:
+        self.steps.append(span)
+        self._emit("step", span)
+        self.logger.debug("Recorded step %s of task %s", span.step, span.task_id)
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Increase the counter ``name`` by ``value``."""
+        self.counters[name] = self.counters.get(name, 0) + value
+        if self.exporter:
+            self.exporter.count(name, value)
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        count = min(len(self._pending), self.flush_size)
+        return [self._pending.popleft() for _ in range(count)]
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        with self._write_lock:
+            for sink in self.sinks:
+                try:
+                    sink.write(batch)
+                except Exception as exc:
+                    self.logger.warning(
+                        "Metrics sink %s failed: %s", sink.__class__.__name__, exc
+                    )
+
+    async def flush(self) -> None:
+        """Write all queued records to the sinks from a worker thread."""
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            await loop.run_in_executor(None, self._write, self._take_batch())
+
+    def flush_sync(self) -> None:
+        """Write all queued records in the calling thread."""
+        while self._pending:
+            self._write(self._take_batch())
+
+    async def _flush_loop(self) -> None:
+        assert self._flush_wakeup is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+            await self.flush()
+
+    async def start(self) -> None:
+        """Start the background flusher and resource sampler if configured."""
+        if self.sampler:
+            await self.sampler.start()
+        if self.sinks and self._flusher is None:
+            self._flush_wakeup = asyncio.Event()
+            self._flusher = asyncio.ensure_future(self._flush_loop())
+
+    async def close(self) -> None:
+        """Stop background tasks, write remaining records and close the sinks."""
+        if self.sampler:
+            await self.sampler.close()
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+            self._flush_wakeup = None
+        if self.sinks:
+            await self.flush()
+            loop = asyncio.get_running_loop()
+            for sink in self.sinks:
+                await loop.run_in_executor(None, sink.close)
+            self.sinks = []
+
+    def summary(self) -> Dict[str, List[Dict]]:
+        """Return count, sum, min/max and p50/p95/p99 latencies.
+
+        Task summaries are grouped by status and template, model call
+        summaries by status.
+        """
+        return {
+            "tasks": [
+                {"status": status, "template": template, **sketch.to_dict()}
+                for (status, template), sketch in self.task_summaries.items()
+            ],
+            "model_calls": [
+                {"status": status, **sketch.to_dict()}
+                for status, sketch in self.model_call_summaries.items()
+            ],
+        }
+
     def resource_usage(self):
+        import psutil
+
         return {
             "cpu_percent": psutil.cpu_percent(),
             "memory": psutil.virtual_memory()._asdict(),
@@ -55,9 +300,18 @@ class Monitor:
         data = {
             "tasks": [asdict(t) for t in self.tasks],
             "model_calls": [asdict(m) for m in self.model_calls],
+            "queue_waits": [asdict(q) for q in self.queue_waits],
+            "steps": [asdict(s) for s in self.steps],
+            "warmups": [asdict(w) for w in self.warmups],
+            "counters": dict(self.counters),
+            "summary": self.summary(),
             "resource_usage": self.resource_usage(),
             "generated_at": datetime.utcnow().isoformat(),
         }
         with open(path, "w") as fh:
             json.dump(data, fh, indent=2)
 
+    def export_otel_json(self, path: str) -> None:
+        """Write recorded step spans as OpenTelemetry OTLP/JSON traces."""
+        with open(path, "w") as fh:
+            json.dump(spans_to_otel(self.steps, self._trace_seed), fh)
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Set
+
+
+class BrowserSessionPool:
+    """Pool of started browser sessions lent out to one task at a time.
+
+    Parameters
+    ----------
+    factory:
+        Coroutine function returning a started ``BrowserSession``.
+    size:
+        Number of sessions kept warm by the pool.
+    """
+
+    def __init__(self, factory: Callable[[], Awaitable[Any]], size: int) -> None:
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self._factory = factory
+        self.size = size
+        self._sessions: List[Any] = []
+        self._idle: Deque[Any] = deque()
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._replacing: Set[asyncio.Future] = set()
+        # Affinity key each session was last released with, by session id
+        self._keys: Dict[int, Hashable] = {}
+        self._closed = False
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def available(self) -> int:
+        """Number of idle sessions ready to be acquired."""
+        return len(self._idle)
+
+    async def start(self) -> None:
+        """Launch all sessions concurrently."""
+        results = await asyncio.gather(
+            *(self._factory() for _ in range(self.size)), return_exceptions=True
+        )
+        errors = [r for r in results if isinstance(r, BaseException)]
+        started = [r for r in results if not isinstance(r, BaseException)]
+        if errors:
+            for session in started:
+                await self._kill(session)
+            raise errors[0]
+        for session in started:
+            self._sessions.append(session)
+            self._put(session)
+        self.logger.info("Browser session pool started with %s sessions", self.size)
+
+    def _put(self, session: Any) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(session)
+                return
+        self._idle.append(session)
+
+    def _take_idle(self, key: Optional[Hashable]) -> Any:
+        if key is not None:
+            for i, session in enumerate(self._idle):
+                if self._keys.get(id(session)) == key:
+                    del self._idle[i]
+                    return session
+        return self._idle.popleft()
+
+    async def acquire(self, key: Optional[Hashable] = None) -> Any:
+        """Check out a connected session, waiting until one is free.
+
+        An idle session last released with the same ``key`` is preferred,
+        so tasks for one site keep landing on the browser holding its state.
+        """
+        while True:
+            if self._closed:
+                raise RuntimeError("Browser session pool is closed")
+            if self._idle:
+                session = self._take_idle(key)
+            else:
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+                try:
+                    session = await waiter
+                except asyncio.CancelledError:
+                    if waiter.done() and not waiter.cancelled():
+                        self._put(waiter.result())
+                    raise
+            if session.is_connected():
+                return session
+            self.logger.warning("Pooled browser session disconnected, replacing")
+            self._replace(session)
+
+    async def release(self, session: Any, discard: bool = False, key: Optional[Hashable] = None) -> None:
+        """Return ``session`` to the pool.
+
+        Sessions that are no longer connected, or released with
+        ``discard=True``, are killed and replaced in the background.
+        ``key`` is remembered for :meth:`acquire` affinity.
+        """
+        if self._closed:
+            await self._kill(session)
+            return
+        if discard or not session.is_connected():
+            self._replace(session)
+        else:
+            if key is not None:
+                self._keys[id(session)] = key
+            self._put(session)
+
+    @asynccontextmanager
+    async def session(self):
+        """Context manager acquiring and releasing a session."""
+        session = await self.acquire()
+        try:
+            yield session
+        except BaseException:
+            await self.release(session, discard=True)
+            raise
+        else:
+            await self.release(session)
+
+    def _replace(self, session: Any) -> None:
+        if session in self._sessions:
+            self._sessions.remove(session)
+        self._keys.pop(id(session), None)
+        task = asyncio.ensure_future(self._replace_session(session))
+        self._replacing.add(task)
+        task.add_done_callback(self._replacing.discard)
+
+    async def _replace_session(self, session: Any) -> None:
+        await self._kill(session)
+        delay = 0.5
+        while not self._closed:
+            try:
+                new_session = await self._factory()
+            except Exception as exc:
+                self.logger.warning("Failed to start replacement session: %s", exc)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+            if self._closed:
+                await self._kill(new_session)
+                return
+            self._sessions.append(new_session)
+            self._put(new_session)
+            return
+
+    async def _kill(self, session: Any) -> None:
+        try:
+            await session.kill()
+        except Exception as exc:
+            self.logger.warning("Error terminating browser session: %s", exc)
+
+    async def close(self) -> None:
+        """Stop every session owned by the pool."""
+        self._closed = True
+        for task in list(self._replacing):
+            task.cancel()
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.cancel()
+        sessions, self._sessions = self._sessions, []
+        self._idle.clear()
+        self._keys.clear()
+        for session in sessions:
+            try:
+                await session.stop()
+            except Exception as exc:
+                self.logger.warning("Error closing browser session: %s", exc)
+            await self._kill(session)
+        self.logger.info("Browser session pool closed")
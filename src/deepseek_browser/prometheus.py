@@ -0,0 +1,226 @@
+import asyncio
+import bisect
+import logging
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import psutil
+
+from ._http import HTTPServer, Response
+
+TASK_DURATION_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+MODEL_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_INVALID_NAME = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        '{}="{}"'.format(
+            n, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for n, v in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class _Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, value: float = 1, labels: Tuple[str, ...] = ()) -> None:
+        self.values[labels] = self.values.get(labels, 0) + value
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, value in self.values.items():
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            )
+        return lines
+
+
+class _Gauge(_Counter):
+    kind = "gauge"
+
+    def set(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        self.values[labels] = value
+
+
+class _Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float],
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> (per bucket counts incl. +Inf, sum)
+        self.series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="{}"'.format(_format_value(bound))
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+def browser_rss() -> int:
+    """Return the summed RSS in bytes of all child processes (the browsers)."""
+    total = 0
+    try:
+        children = psutil.Process().children(recursive=True)
+    except psutil.Error:
+        return 0
+    for child in children:
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            continue
+    return total
+
+
+class PrometheusExporter:
+    """Prometheus metrics fed incrementally by :class:`Monitor`.
+
+    Parameters
+    ----------
+    namespace:
+        Prefix applied to every metric name.
+    rss_provider:
+        Callable returning the browser RSS in bytes. It runs in a worker
+        thread on each scrape. Defaults to :func:`browser_rss`.
+    """
+
+    def __init__(
+        self,
+        namespace: str = "deepseek",
+        rss_provider: Optional[Callable[[], int]] = None,
+    ) -> None:
+        self.namespace = namespace
+        self.rss_provider = rss_provider or browser_rss
+        self.task_duration = _Histogram(
+            f"{namespace}_task_duration_seconds",
+            "Task duration in seconds.",
+            ("status", "template"),
+            TASK_DURATION_BUCKETS,
+        )
+        self.model_call_latency = _Histogram(
+            f"{namespace}_model_call_seconds",
+            "Model call latency in seconds.",
+            ("status", "template"),
+            MODEL_LATENCY_BUCKETS,
+        )
+        self.tasks_in_flight = _Gauge(
+            f"{namespace}_tasks_in_flight", "Number of tasks currently running."
+        )
+        self.browser_rss_bytes = _Gauge(
+            f"{namespace}_browser_rss_bytes", "Resident memory of browser processes."
+        )
+        self.counters: Dict[str, _Counter] = {}
+        self._server: Optional[HTTPServer] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def observe_task(self, status: str, template: Optional[str], duration: float) -> None:
+        self.task_duration.observe(duration, (status, template or ""))
+
+    def observe_model_call(self, status: str, template: Optional[str], duration: float) -> None:
+        self.model_call_latency.observe(duration, (status, template or ""))
+
+    def set_in_flight(self, count: int) -> None:
+        self.tasks_in_flight.set(count)
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Increase the ``<namespace>_<name>_total`` counter."""
+        counter = self.counters.get(name)
+        if counter is None:
+            metric_name = f"{self.namespace}_{_INVALID_NAME.sub('_', name)}_total"
+            counter = self.counters[name] = _Counter(metric_name, f"Total {name}.")
+        counter.inc(value)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in (
+            self.task_duration,
+            self.model_call_latency,
+            self.tasks_in_flight,
+            self.browser_rss_bytes,
+            *self.counters.values(),
+        ):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    async def _handle(self, method: str, path: str, headers, body: bytes) -> Response:
+        if method != "GET" or path.split("?", 1)[0] != "/metrics":
+            return 404, {}, b""
+        loop = asyncio.get_running_loop()
+        try:
+            rss = await loop.run_in_executor(None, self.rss_provider)
+            self.browser_rss_bytes.set(rss)
+        except Exception as exc:
+            self.logger.warning("Failed to sample browser RSS: %s", exc)
+        return (
+            200,
+            {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+            self.render().encode(),
+        )
+
+    async def start(self, host: str = "0.0.0.0", port: int = 9187) -> None:
+        """Serve ``/metrics`` on ``host:port`` from the running event loop."""
+        if self._server is None:
+            self._server = HTTPServer(self._handle, host, port)
+            await self._server.start()
+
+    @property
+    def port(self) -> Optional[int]:
+        return self._server.port if self._server else None
+
+    async def close(self) -> None:
+        if self._server is not None:
+            await self._server.close()
+            self._server = None
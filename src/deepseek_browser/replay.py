@@ -0,0 +1,308 @@
+"""Record Ollama exchanges and web pages once, then replay them offline.
+
+:class:`OllamaRecorder` is a proxy placed between ``BrowserAgent`` and a real
+Ollama server that saves every exchange to a :class:`Recording`.
+:class:`OllamaReplayServer` answers the same requests from the recording and
+:class:`StaticSiteServer` serves page snapshots taken with
+:func:`snapshot_page`, so the full ``run_task`` path can run without network
+access::
+
+    async with StaticSiteServer("pages") as site, OllamaReplayServer(
+        Recording.load("run.json"), aliases={"site": site.url}
+    ) as ollama:
+        config = BrowserAgentConfig(ollama_url=ollama.url)
+        await agent.run_task(f"Open {site.url}/example.com/ and read the title")
+
+Values that differ between runs, such as the port of the site server, are
+passed as ``aliases`` to both the recorder and the replay server. They are
+stored as placeholders and put back into replayed responses. Timestamps are
+ignored when matching requests.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import urllib.error
+import urllib.parse
+import urllib.request
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from ._http import HTTPServer, Response
+
+# Request fields that decide the model output; streaming flags, keep-alive
+# and similar transport options are ignored when matching.
+_KEY_FIELDS = ("model", "messages", "prompt", "system", "options", "format", "tools")
+# Agent prompts carry the current time, which never matches a recording
+_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?")
+
+
+def _placeholder(name: str) -> str:
+    return f"<alias:{name}>"
+
+
+def hide_aliases(text: str, aliases: Optional[Mapping[str, str]]) -> str:
+    """Replace each alias value in ``text`` with its placeholder."""
+    # Longest first, so a value containing another one is replaced whole
+    for name, value in sorted((aliases or {}).items(), key=lambda a: -len(a[1])):
+        if value:
+            text = text.replace(value, _placeholder(name))
+    return text
+
+
+def restore_aliases(text: str, aliases: Optional[Mapping[str, str]]) -> str:
+    """Put the current alias values back in place of their placeholders."""
+    for name, value in (aliases or {}).items():
+        text = text.replace(_placeholder(name), value)
+    return text
+
+
+def exchange_key(path: str, body: bytes, aliases: Optional[Mapping[str, str]] = None) -> str:
+    """Return the replay key of an Ollama API request.
+
+    Alias values and timestamps are normalized out, so the same exchange
+    matches across runs.
+    """
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        payload = {"raw": body.decode("utf-8", "replace")}
+    if isinstance(payload, dict):
+        payload = {k: payload[k] for k in _KEY_FIELDS if k in payload}
+    data = json.dumps([path, payload], sort_keys=True, default=str)
+    data = _TIMESTAMP.sub("<timestamp>", hide_aliases(data, aliases))
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class Recording:
+    """Ollama responses captured by :class:`OllamaRecorder`.
+
+    Responses are grouped by :func:`exchange_key`. A prompt sent several times
+    keeps every response in order so a replay sees the same sequence.
+    """
+
+    def __init__(self, exchanges: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.exchanges: List[Dict[str, Any]] = list(exchanges or [])
+
+    def add(
+        self,
+        path: str,
+        body: bytes,
+        status: int,
+        content_type: str,
+        response: bytes,
+        aliases: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.exchanges.append(
+            {
+                "key": exchange_key(path, body, aliases),
+                "path": path,
+                "request": hide_aliases(body.decode("utf-8", "replace"), aliases),
+                "status": status,
+                "content_type": content_type,
+                "response": hide_aliases(response.decode("utf-8", "replace"), aliases),
+            }
+        )
+
+    def responses(self, key: str) -> List[Dict[str, Any]]:
+        return [e for e in self.exchanges if e["key"] == key]
+
+    def models(self) -> List[str]:
+        names = set()
+        for exchange in self.exchanges:
+            try:
+                model = json.loads(exchange["request"] or "{}").get("model")
+            except (ValueError, AttributeError):
+                continue
+            if model:
+                names.add(model)
+        return sorted(names)
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"version": 1, "exchanges": self.exchanges}, fh, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        with open(path, encoding="utf-8") as fh:
+            return cls(json.load(fh)["exchanges"])
+
+
+class _Server(ABC):
+    def __init__(self, host: str, port: int) -> None:
+        self.server = HTTPServer(self._handle, host, port)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def url(self) -> str:
+        return self.server.url
+
+    @abstractmethod
+    async def _handle(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Response:
+        """Answer one request."""
+
+    async def start(self) -> None:
+        await self.server.start()
+
+    async def close(self) -> None:
+        await self.server.close()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+
+class OllamaRecorder(_Server):
+    """Proxy forwarding requests to ``upstream`` and recording the answers.
+
+    Point ``BrowserAgentConfig.ollama_url`` at :attr:`url`, run the tasks,
+    then :meth:`Recording.save` the :attr:`recording`. Responses are
+    buffered, so streamed replies reach the client in one piece.
+    ``aliases`` maps placeholder names to values that change between runs.
+    """
+
+    def __init__(
+        self,
+        upstream: str,
+        recording: Optional[Recording] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        timeout: float = 600.0,
+        aliases: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        super().__init__(host, port)
+        self.upstream = upstream.rstrip("/")
+        self.recording = recording if recording is not None else Recording()
+        self.timeout = timeout
+        self.aliases: Dict[str, str] = dict(aliases or {})
+
+    def _forward(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, str, bytes]:
+        request = urllib.request.Request(
+            self.upstream + path,
+            data=body if method != "GET" else None,
+            method=method,
+            headers={"Content-Type": headers.get("content-type", "application/json")},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as resp:
+                return resp.status, resp.headers.get("Content-Type", ""), resp.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.headers.get("Content-Type", ""), exc.read()
+
+    async def _handle(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Response:
+        loop = asyncio.get_running_loop()
+        status, content_type, response = await loop.run_in_executor(
+            None, self._forward, method, path, headers, body
+        )
+        if path.startswith("/api/"):
+            self.recording.add(path, body, status, content_type, response, self.aliases)
+        return status, {"Content-Type": content_type or "application/json"}, response
+
+
+class OllamaReplayServer(_Server):
+    """Answer Ollama API requests from a :class:`Recording`.
+
+    Unknown requests get a 404 error response, which ``BrowserAgent`` treats
+    like any other model failure. ``/api/tags`` lists the recorded models
+    when it was not recorded itself. ``aliases`` must use the names given to
+    the recorder, with this run's values.
+    """
+
+    def __init__(
+        self,
+        recording: Recording,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        aliases: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        super().__init__(host, port)
+        self.recording = recording
+        self.aliases: Dict[str, str] = dict(aliases or {})
+        self.misses = 0
+        self._served: Dict[str, int] = {}
+
+    def _replay(self, path: str, body: bytes) -> Optional[Dict[str, Any]]:
+        key = exchange_key(path, body, self.aliases)
+        responses = self.recording.responses(key)
+        if not responses:
+            return None
+        index = self._served.get(key, 0)
+        self._served[key] = index + 1
+        # Prompts repeated more often than recorded reuse the last answer
+        return responses[min(index, len(responses) - 1)]
+
+    async def _handle(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Response:
+        exchange = self._replay(path, body)
+        if exchange is not None:
+            return (
+                exchange["status"],
+                {"Content-Type": exchange["content_type"] or "application/json"},
+                restore_aliases(exchange["response"], self.aliases).encode("utf-8"),
+            )
+        if path == "/api/tags":
+            models = [{"name": m, "model": m} for m in self.recording.models()]
+            return 200, {"Content-Type": "application/json"}, json.dumps({"models": models}).encode()
+        if method == "HEAD" or path == "/":
+            return 200, {"Content-Type": "text/plain"}, b"Ollama is running"
+        self.misses += 1
+        self.logger.warning("No recorded response for %s %s", method, path)
+        error = json.dumps({"error": f"no recorded response for {path}"}).encode()
+        return 404, {"Content-Type": "application/json"}, error
+
+
+def _snapshot_path(root: str, url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path or "/"
+    if path.endswith("/"):
+        path += "index.html"
+    return os.path.join(root, parts.netloc, *[p for p in path.split("/") if p not in ("", "..")])
+
+
+def snapshot_page(url: str, root: str, timeout: float = 30.0) -> str:
+    """Save the document at ``url`` under ``root`` and return the file path.
+
+    The page is stored as ``<root>/<host>/<path>`` and served by
+    :class:`StaticSiteServer` at ``<site url>/<host>/<path>``.
+    """
+    target = _snapshot_path(root, url)
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        content = resp.read()
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, "wb") as fh:
+        fh.write(content)
+    return target
+
+
+class StaticSiteServer(_Server):
+    """Serve files below ``root``, using ``index.html`` for directories."""
+
+    def __init__(self, root: str, host: str = "127.0.0.1", port: int = 0) -> None:
+        super().__init__(host, port)
+        self.root = os.path.abspath(root)
+
+    def _read(self, path: str) -> Optional[Tuple[str, bytes]]:
+        relative = urllib.parse.unquote(urllib.parse.urlsplit(path).path).lstrip("/")
+        target = os.path.abspath(os.path.join(self.root, relative))
+        if target != self.root and not target.startswith(self.root + os.sep):
+            return None
+        if os.path.isdir(target):
+            target = os.path.join(target, "index.html")
+        if not os.path.isfile(target):
+            return None
+        content_type = mimetypes.guess_type(target)[0] or "application/octet-stream"
+        with open(target, "rb") as fh:
+            return content_type, fh.read()
+
+    async def _handle(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Response:
+        found = await asyncio.get_running_loop().run_in_executor(None, self._read, path)
+        if found is None:
+            return 404, {"Content-Type": "text/plain"}, b"Not Found"
+        content_type, content = found
+        return 200, {"Content-Type": content_type}, content
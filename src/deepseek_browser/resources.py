@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set, Tuple
+
+import psutil
+
+
+@dataclass
+class ResourceUsage:
+    """Resources consumed by the browser processes serving one task.
+
+    ``net_bytes`` is measured from host-wide counters and is therefore only
+    reported when no other task was tracked at the same time. ``shared`` is
+    set when another task was tracked on the same browser, in which case
+    ``cpu_seconds`` and ``peak_rss`` cover both tasks.
+    """
+
+    cpu_seconds: float = 0.0
+    peak_rss: int = 0
+    net_bytes: Optional[int] = None
+    shared: bool = False
+
+
+@dataclass
+class _Tracked:
+    roots: Set[int] = field(default_factory=set)
+    baseline: Dict[int, float] = field(default_factory=dict)
+    last: Dict[int, float] = field(default_factory=dict)
+    peak_rss: int = 0
+    net_start: Optional[int] = None
+    exclusive: bool = True
+    shared: bool = False
+
+
+def _net_bytes() -> int:
+    counters = psutil.net_io_counters()
+    return counters.bytes_sent + counters.bytes_recv
+
+
+def _read_trees(roots: Set[int]) -> Tuple[Dict[int, float], int]:
+    """Return CPU seconds per process and total RSS of the trees at ``roots``."""
+    cpu: Dict[int, float] = {}
+    rss = 0
+    for root in roots:
+        try:
+            proc = psutil.Process(root)
+            processes = [proc] + proc.children(recursive=True)
+        except psutil.Error:
+            continue
+        for p in processes:
+            try:
+                with p.oneshot():
+                    times = p.cpu_times()
+                    rss += p.memory_info().rss
+            except psutil.Error:
+                continue
+            cpu[p.pid] = times.user + times.system
+    return cpu, rss
+
+
+class ResourceSampler:
+    """Attribute CPU, memory and network use of browser process trees to tasks.
+
+    A background task samples every tracked process tree each ``interval``
+    seconds in a worker thread. Processes are followed from the browser's
+    root PID through all of its children (renderers, GPU and network
+    helpers). :meth:`track` and :meth:`untrack` also read the trees
+    directly, so short tasks and the time before the first sample count.
+    """
+
+    def __init__(self, interval: float = 0.5) -> None:
+        self.interval = interval
+        self._tracked: Dict[int, _Tracked] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def track(self, task_id: int, pid: int) -> None:
+        """Start attributing the process tree rooted at ``pid`` to ``task_id``."""
+        # Baseline, so CPU time spent before tracking is not counted
+        cpu, rss = _read_trees({pid})
+        with self._lock:
+            entry = self._tracked.get(task_id)
+            if entry is None:
+                entry = self._tracked[task_id] = _Tracked()
+                if self._tracked.keys() - {task_id}:
+                    for other in self._tracked.values():
+                        other.exclusive = False
+                else:
+                    entry.net_start = _net_bytes()
+            for other in self._tracked.values():
+                if other is not entry and pid in other.roots:
+                    other.shared = entry.shared = True
+            entry.roots.add(pid)
+            for child, seconds in cpu.items():
+                entry.baseline.setdefault(child, seconds)
+            self._update(entry, cpu, rss)
+
+    def untrack(self, task_id: int) -> Optional[ResourceUsage]:
+        """Stop tracking ``task_id`` and return its accumulated usage."""
+        with self._lock:
+            entry = self._tracked.get(task_id)
+            roots = set(entry.roots) if entry is not None else set()
+        if entry is None:
+            return None
+        # Final reading, so work since the last sample is included
+        cpu, rss = _read_trees(roots)
+        with self._lock:
+            self._tracked.pop(task_id, None)
+            self._update(entry, cpu, rss)
+            usage = ResourceUsage(
+                cpu_seconds=sum(entry.last[pid] - entry.baseline[pid] for pid in entry.last),
+                peak_rss=entry.peak_rss,
+                shared=entry.shared,
+            )
+        if entry.exclusive and entry.net_start is not None:
+            usage.net_bytes = _net_bytes() - entry.net_start
+        return usage
+
+    @staticmethod
+    def _update(entry: _Tracked, cpu: Dict[int, float], rss: int) -> None:
+        for pid, seconds in cpu.items():
+            # Processes spawned after tracking started count in full
+            entry.baseline.setdefault(pid, 0.0)
+            entry.last[pid] = seconds
+        entry.peak_rss = max(entry.peak_rss, rss)
+
+    def sample(self) -> None:
+        """Take one sample of every tracked process tree."""
+        with self._lock:
+            roots = {task_id: set(entry.roots) for task_id, entry in self._tracked.items()}
+        readings = {task_id: _read_trees(pids) for task_id, pids in roots.items()}
+        with self._lock:
+            for task_id, (cpu, rss) in readings.items():
+                entry = self._tracked.get(task_id)
+                if entry is not None:
+                    self._update(entry, cpu, rss)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.sample)
+            except Exception as exc:
+                self.logger.warning("Resource sampling failed: %s", exc)
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
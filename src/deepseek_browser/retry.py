@@ -0,0 +1,147 @@
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from .llm_cache import ReplayMiss
+
+LLM_UNAVAILABLE = "llm_unavailable"
+NAVIGATION_TIMEOUT = "navigation_timeout"
+SESSION_CRASH = "session_crash"
+TASK_ERROR = "task_error"
+REPLAY_MISS = "replay_miss"
+
+# Exception class names raised by httpx and the ollama client when the
+# server cannot be reached or drops the request. Matching on names avoids
+# importing either package.
+_CONNECTION_ERRORS = {
+    "ConnectError",
+    "ConnectTimeout",
+    "ReadError",
+    "ReadTimeout",
+    "WriteTimeout",
+    "PoolTimeout",
+    "RemoteProtocolError",
+}
+_SESSION_MESSAGES = ("target closed", "browser has been closed", "browser closed", "has disconnected")
+_NAVIGATION_MESSAGES = ("navigation timeout", "net::err_", "timeout exceeded while waiting")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling Ollama while the circuit breaker is open."""
+
+
+def _type_names(exc: BaseException):
+    return {cls.__name__ for cls in type(exc).__mro__}
+
+
+def classify_error(exc: BaseException, session: Any = None) -> str:
+    """Return the failure class of an exception raised by an agent run.
+
+    ``session`` is the browser session the run used. A session that is no
+    longer connected marks the failure as a crash whatever was raised.
+    """
+    for error in (exc, exc.__cause__, exc.__context__):
+        if error is None:
+            continue
+        if isinstance(error, ReplayMiss):
+            return REPLAY_MISS
+        names = _type_names(error)
+        if isinstance(error, CircuitOpenError) or names & _CONNECTION_ERRORS:
+            return LLM_UNAVAILABLE
+        status = getattr(error, "status_code", None)
+        if "ResponseError" in names and isinstance(status, int) and (status >= 500 or status == 429):
+            return LLM_UNAVAILABLE
+    if session is not None and not session.is_connected():
+        return SESSION_CRASH
+    message = str(exc).lower()
+    if "TargetClosedError" in _type_names(exc) or any(m in message for m in _SESSION_MESSAGES):
+        return SESSION_CRASH
+    if isinstance(exc, TimeoutError) or any(m in message for m in _NAVIGATION_MESSAGES):
+        return NAVIGATION_TIMEOUT
+    return TASK_ERROR
+
+
+@dataclass
+class RetryPolicy:
+    """How :class:`BrowserAgent` retries one failure class.
+
+    Attributes
+    ----------
+    max_retries:
+        Retries allowed for this class. ``None`` uses
+        ``BrowserAgentConfig.retries``.
+    base_delay, max_delay:
+        Exponential backoff bounds in seconds. The n-th retry waits a random
+        time between zero and ``min(max_delay, base_delay * 2 ** (n - 1))``.
+    discard_session:
+        Replace the browser session before retrying. When ``False`` the next
+        attempt reuses the same browser.
+    """
+
+    max_retries: Optional[int] = None
+    base_delay: float = 0.0
+    max_delay: float = 30.0
+    discard_session: bool = False
+
+    def delay(self, attempt: int) -> float:
+        cap = min(self.max_delay, self.base_delay * 2 ** max(attempt - 1, 0))
+        return random.uniform(0, cap)
+
+
+DEFAULT_RETRY_POLICIES: Dict[str, RetryPolicy] = {
+    # Ollama restarting or overloaded: back off and keep the browser
+    LLM_UNAVAILABLE: RetryPolicy(max_retries=3, base_delay=1.0, max_delay=30.0),
+    NAVIGATION_TIMEOUT: RetryPolicy(base_delay=0.5, max_delay=5.0),
+    SESSION_CRASH: RetryPolicy(discard_session=True),
+    TASK_ERROR: RetryPolicy(),
+    # A prompt missing from the replay cache stays missing
+    REPLAY_MISS: RetryPolicy(max_retries=0),
+}
+
+
+class CircuitBreaker:
+    """Fail fast while the LLM backend is down.
+
+    After ``failure_threshold`` consecutive LLM failures the circuit opens
+    and :meth:`check` raises :class:`CircuitOpenError` for ``reset_timeout``
+    seconds. After that a single trial call is let through. If it succeeds
+    the circuit closes, and if it fails the circuit opens again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self._trial else "open"
+
+    def check(self) -> None:
+        """Raise :class:`CircuitOpenError` unless a call may proceed."""
+        if self.opened_at is None:
+            return
+        now = time.monotonic()
+        if now - self.opened_at >= self.reset_timeout:
+            # Let one trial through and restart the window, so a trial that
+            # never reports back does not keep the circuit shut for good
+            self.opened_at = now
+            self._trial = True
+            return
+        raise CircuitOpenError("Ollama circuit breaker is open")
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._trial = False
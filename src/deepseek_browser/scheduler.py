@@ -0,0 +1,72 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import List, Tuple
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+class TaskScheduler:
+    """Admission queue limiting how many tasks run at once.
+
+    Tasks wait in a priority queue until one of ``max_concurrency`` slots is
+    free. Lower priority values run first and tasks with equal priority are
+    admitted in submission order.
+    """
+
+    def __init__(self, max_concurrency: int) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.running = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._waiting = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of tasks waiting for a slot."""
+        return self._waiting
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL) -> float:
+        """Wait for a free slot and return the time spent queued."""
+        if self.running < self.max_concurrency and not self._waiting:
+            self.running += 1
+            return 0.0
+        start = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._counter), waiter))
+        self._waiting += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before cancellation
+                self.release()
+            else:
+                self._waiting -= 1
+            raise
+        return time.perf_counter() - start
+
+    def release(self) -> None:
+        """Free a slot, handing it to the next queued task if any."""
+        while self._queue:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                self._waiting -= 1
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_NORMAL):
+        """Context manager holding a slot; yields the queue wait time."""
+        waited = await self.acquire(priority)
+        try:
+            yield waited
+        finally:
+            self.release()
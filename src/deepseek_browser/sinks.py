@@ -0,0 +1,62 @@
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+
+class MetricsSink(ABC):
+    """Destination receiving batches of metric records from :class:`Monitor`.
+
+    ``write`` is called from a worker thread, one batch at a time.
+    """
+
+    @abstractmethod
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """Store one batch of records."""
+
+    def close(self) -> None:
+        pass
+
+
+class JSONLSink(MetricsSink):
+    """Append records to ``path`` as one JSON document per line."""
+
+    def __init__(self, path: str, fsync: bool = True) -> None:
+        self.path = path
+        self.fsync = fsync
+        self._fh = open(path, "a", encoding="utf-8")
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        self._fh.write("".join(json.dumps(r, default=str) + "\n" for r in records))
+        self._fh.flush()
+        if self.fsync:
+            os.fsync(self._fh.fileno())
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class SQLiteSink(MetricsSink):
+    """Insert records into a ``metrics`` table of a SQLite database."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS metrics ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, "
+            "recorded_at REAL NOT NULL, data TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS metrics_kind ON metrics (kind, recorded_at)")
+        self._conn.commit()
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        self._conn.executemany(
+            "INSERT INTO metrics (kind, recorded_at, data) VALUES (?, ?, ?)",
+            [(r["kind"], r["recorded_at"], json.dumps(r, default=str)) for r in records],
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
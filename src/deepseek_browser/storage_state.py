@@ -0,0 +1,143 @@
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, List, Optional
+
+_URL = re.compile(r"https?://[^\s/'\"<>()]+", re.IGNORECASE)
+_BARE_DOMAIN = re.compile(r"\b((?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z]{2,})\b", re.IGNORECASE)
+# Top-level domains accepted without a scheme. Country codes that double as
+# file extensions (.md, .py, .sh, .rs, .pl, ...) are left out on purpose.
+_KNOWN_TLDS = frozenset(
+    {
+        "com", "org", "net", "edu", "gov", "mil", "int", "io", "co", "ai", "dev",
+        "app", "info", "biz", "me", "tv", "news", "blog", "shop", "site", "online",
+        "tech", "xyz", "uk", "de", "fr", "es", "it", "nl", "be", "ch", "at", "se",
+        "dk", "fi", "ie", "eu", "us", "ca", "au", "nz", "jp", "cn", "kr", "in", "br",
+        "mx", "ar", "ru", "za",
+    }
+)
+
+
+def task_domain(description: str) -> Optional[str]:
+    """Return the first site named in a task description, without ``www.``.
+
+    Full URLs take precedence over bare names like ``example.com``, which
+    only count with a well known top-level domain so that ``node.js`` or
+    ``report.txt`` are not taken for sites.
+    """
+    match = _URL.search(description)
+    host = urllib.parse.urlsplit(match.group(0)).hostname if match else None
+    if host is None:
+        host = next(
+            (
+                m.group(1)
+                for m in _BARE_DOMAIN.finditer(description)
+                if m.group(1).rsplit(".", 1)[1].lower() in _KNOWN_TLDS
+            ),
+            None,
+        )
+    if not host:
+        return None
+    host = host.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _related(host: str, domain: str) -> bool:
+    """Whether cookies or storage of ``host`` apply to ``domain``, or vice versa."""
+    host = host.lstrip(".").lower()
+    return host == domain or host.endswith("." + domain) or domain.endswith("." + host)
+
+
+def filter_storage_state(state: Dict[str, Any], domain: str) -> Dict[str, Any]:
+    """Keep the cookies and origins of a Playwright storage state for ``domain``.
+
+    A context visits many third-party hosts; only what belongs to the
+    task's site is worth keeping under its name.
+    """
+    cookies = [c for c in state.get("cookies", []) if _related(c.get("domain", ""), domain)]
+    origins = [
+        o
+        for o in state.get("origins", [])
+        if _related(urllib.parse.urlsplit(o.get("origin", "")).hostname or "", domain)
+    ]
+    return {"cookies": cookies, "origins": origins}
+
+
+class StorageStateStore:
+    """Playwright storage states of each site, one JSON file per domain.
+
+    States older than ``max_age`` seconds are dropped when loaded, and
+    :meth:`save` removes the least recently saved files beyond
+    ``max_entries``. The files hold login cookies, so ``directory`` should
+    not be shared with other users.
+    """
+
+    def __init__(self, directory: str, max_age: Optional[float] = 7 * 86400, max_entries: int = 100) -> None:
+        self.directory = directory
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, domain: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^a-z0-9.-]", "_", domain.lower()) + ".json")
+
+    def _files(self) -> List[str]:
+        return [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        ]
+
+    def _expired(self, path: str) -> bool:
+        return self.max_age is not None and time.time() - os.path.getmtime(path) > self.max_age
+
+    def load(self, domain: str) -> Optional[Dict[str, Any]]:
+        path = self.path(domain)
+        with self._lock:
+            try:
+                if self._expired(path):
+                    os.remove(path)
+                    return None
+                with open(path, encoding="utf-8") as fh:
+                    return json.load(fh)
+            except (OSError, ValueError):
+                return None
+
+    def save(self, domain: str, state: Dict[str, Any]) -> None:
+        path = self.path(domain)
+        with self._lock:
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(state, fh)
+            # Atomic, so a crash never leaves a truncated state behind
+            os.replace(tmp, path)
+            self._evict()
+
+    def delete(self, domain: str) -> None:
+        with self._lock:
+            try:
+                os.remove(self.path(domain))
+            except FileNotFoundError:
+                pass
+
+    def evict(self) -> None:
+        """Remove expired states and the oldest ones beyond ``max_entries``."""
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        kept = []
+        for path in sorted(self._files(), key=os.path.getmtime):
+            if self._expired(path):
+                os.remove(path)
+            else:
+                kept.append(path)
+        for path in kept[: max(0, len(kept) - self.max_entries)]:
+            os.remove(path)
+
+    def __len__(self) -> int:
+        return len(self._files())
@@ -1,13 +1,15 @@
 import asyncio
 import logging
-import time
 import inspect
+import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List, Optional, Set, Union
 
 from ollama_config import BrowserAgent, BrowserAgentConfig
+from .cache import ResultCache, cache_key
 from .monitoring import Monitor
+from .scheduler import PRIORITY_NORMAL, TaskScheduler
 
 
 @dataclass
@@ -20,10 +22,13 @@ class TaskResult:
         Whether the task completed successfully.
     history:
         Raw interaction history returned by ``BrowserAgent``.
+    cached:
+        Whether the history was served from the :class:`ResultCache`.
     """
 
     success: bool
     history: Any
+    cached: bool = False
 
 
 @dataclass
@@ -35,14 +40,26 @@ class Task:
     description:
         Natural language instruction provided by the user.
     task_id:
-        Unique identifier assigned by ``TaskExecutor``.
+        Identifier assigned by ``TaskExecutor``, unique within the executor.
+    run_id:
+        Identifier unique across executors and processes. Checkpoints are
+        saved under it, so it is what :meth:`TaskExecutor.resume` takes.
     status:
-        Current status. One of ``pending``, ``running``, ``success``, ``failed``
-        or ``timeout``.
+        Current status. One of ``pending``, ``queued``, ``running``,
+        ``success``, ``failed``, ``timeout`` or ``cancelled``.
     result:
         Populated with a :class:`TaskResult` when the task finishes successfully.
     error:
-        Error message when ``status`` is ``failed`` or ``timeout``.
+        Error message when ``status`` is ``failed``, ``timeout`` or
+        ``cancelled``.
+    priority:
+        Scheduling priority, lower values run first.
+    idempotency_key:
+        Optional caller supplied key identifying the task in the result
+        cache.
+    template:
+        Name of the template the description was rendered from, used to
+        label metrics.
     created_at:
         Timestamp when the task object was created.
     started_at:
@@ -53,14 +70,54 @@ class Task:
 
     description: str
     task_id: int
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
     status: str = "pending"
     result: Optional[TaskResult] = None
     error: Optional[str] = None
+    priority: int = PRIORITY_NORMAL
+    idempotency_key: Optional[str] = None
+    template: Optional[str] = None
     created_at: datetime = field(default_factory=datetime.utcnow)
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
 
 
+@dataclass
+class BatchProgress:
+    """Aggregate progress of a :meth:`TaskExecutor.execute_many` batch."""
+
+    submitted: int = 0
+    completed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    timed_out: int = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self.submitted - self.completed
+
+    def update(self, task: Task) -> None:
+        self.completed += 1
+        if task.status == "success":
+            self.succeeded += 1
+        elif task.status == "timeout":
+            self.timed_out += 1
+        else:
+            self.failed += 1
+
+
+_MISSING = object()
+
+
+async def _iterate(items: Union[Iterable[str], AsyncIterable[str]]):
+    if hasattr(items, "__aiter__"):
+        async for item in items:  # type: ignore[union-attr]
+            yield item
+    else:
+        for item in items:  # type: ignore[union-attr]
+            yield item
+
+
 class TaskExecutor:
     """Execute tasks using :class:`BrowserAgent` with progress tracking.
 
@@ -73,6 +130,19 @@ class TaskExecutor:
         is provided.
     agent:
         Existing :class:`BrowserAgent` instance. Mainly used for testing.
+    monitor:
+        :class:`Monitor` receiving task metrics. A new one is created when
+        omitted.
+    max_concurrency:
+        Maximum number of tasks running at once. Additional tasks wait in a
+        priority queue. ``None`` runs every task immediately.
+    cache:
+        Optional :class:`ResultCache`. Successful results are stored and
+        identical tasks are answered from the cache without running the agent.
+    coalesce:
+        When ``True`` identical tasks submitted while one is already running
+        wait for that run instead of starting another one. Each caller still
+        receives its own :class:`Task`.
     """
 
     def __init__(
@@ -81,74 +151,308 @@ class TaskExecutor:
         default_timeout: int = 300,
         agent: Optional[BrowserAgent] = None,
         monitor: Optional[Monitor] = None,
+        max_concurrency: Optional[int] = None,
+        cache: Optional[ResultCache] = None,
+        coalesce: bool = False,
     ) -> None:
         self.monitor = monitor or Monitor()
         self.agent = agent or BrowserAgent(agent_config, monitor=self.monitor)
         self.default_timeout = default_timeout
+        self.scheduler = TaskScheduler(max_concurrency) if max_concurrency else None
+        self.cache = cache
+        self.coalesce = coalesce
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._active: Dict[int, asyncio.Future] = {}
+        self._cancel_requested: Set[int] = set()
         self.tasks: List[Task] = []
         self.logger = logging.getLogger(self.__class__.__name__)
 
     async def start(self) -> None:
         """Initialize the underlying :class:`BrowserAgent`.
 
-        Must be called before executing any tasks.
+        Must be called before executing any tasks. With
+        ``BrowserAgentConfig(warm_up=True)`` this also preloads the model and
+        browser so the first task does not pay their cold start.
         """
+        if self.monitor:
+            await self.monitor.start()
         await self.agent.create_agent()
 
-    async def execute(self, description: str, timeout: Optional[int] = None) -> Task:
-        """Execute a single task.
+    def _new_task(
+        self,
+        description: str,
+        priority: int,
+        idempotency_key: Optional[str] = None,
+        template: Optional[str] = None,
+    ) -> Task:
+        task = Task(
+            description=description,
+            task_id=len(self.tasks) + 1,
+            priority=priority,
+            idempotency_key=idempotency_key,
+            template=template,
+        )
+        self.tasks.append(task)
+        return task
 
-        Parameters
-        ----------
-        description:
-            Natural language instruction for the agent.
-        timeout:
-            Optional per-task timeout in seconds.
+    def _cache_key(self, task: Task) -> str:
+        return cache_key(
+            task.description,
+            getattr(self.agent, "config", None),
+            task.idempotency_key,
+        )
 
-        Returns
-        -------
-        Task
-            Object containing status, result and metadata.
-        """
-        task = Task(description=description, task_id=len(self.tasks) + 1)
-        self.tasks.append(task)
+    async def _from_cache(self, task: Task) -> bool:
+        assert self.cache is not None
+        # SQLite reads also commit the access time; keep them off the loop
+        loop = asyncio.get_running_loop()
+        history = await loop.run_in_executor(None, self.cache.get, self._cache_key(task), _MISSING)
+        if history is _MISSING:
+            if self.monitor:
+                self.monitor.increment("result_cache_misses")
+            return False
+        if self.monitor:
+            self.monitor.increment("result_cache_hits")
+        task.started_at = datetime.utcnow()
+        task.result = TaskResult(success=True, history=history, cached=True)
+        task.status = "success"
+        self.logger.info("Task %s answered from cache", task.task_id)
+        return True
 
-        self.logger.info("Starting task %s: %s", task.task_id, description)
+    async def _call_agent(self, task: Task, timeout: Optional[float], resume: bool = False) -> Any:
+        timeout = timeout or self.default_timeout
+        parameters = inspect.signature(self.agent.run_task).parameters
+        if 'task_id' in parameters:
+            options: Dict[str, Any] = {"task_id": task.task_id}
+            if resume:
+                options["resume"] = True
+            if 'deadline' in parameters:
+                options["deadline"] = asyncio.get_running_loop().time() + timeout
+            if task.template is not None and 'template' in parameters:
+                options["template"] = task.template
+            if 'run_id' in parameters:
+                options["run_id"] = task.run_id
+            coro = self.agent.run_task(task.description, **options)
+        else:
+            coro = self.agent.run_task(task.description)
+        return await asyncio.wait_for(coro, timeout=timeout)
+
+    def _mark_running(self, task: Task) -> None:
         task.status = "running"
         task.started_at = datetime.utcnow()
+        if self.monitor:
+            self.monitor.record_task_start(task)
 
+    async def _follow(self, task: Task, leader: asyncio.Future, timeout: Optional[float]) -> Any:
+        self.logger.info("Task %s attached to an identical running task", task.task_id)
+        if self.monitor:
+            self.monitor.increment("coalesced_tasks")
+        self._mark_running(task)
         try:
-            start = time.perf_counter()
-            if 'task_id' in inspect.signature(self.agent.run_task).parameters:
-                history = await asyncio.wait_for(
-                    self.agent.run_task(description, task_id=task.task_id),
-                    timeout=timeout or self.default_timeout,
-                )
-            else:
-                history = await asyncio.wait_for(
-                    self.agent.run_task(description),
-                    timeout=timeout or self.default_timeout,
-                )
-            _ = time.perf_counter() - start
+            return await asyncio.wait_for(
+                asyncio.shield(leader), timeout=timeout or self.default_timeout
+            )
+        except asyncio.CancelledError:
+            if leader.cancelled():
+                raise RuntimeError("Coalesced task was cancelled") from None
+            raise
+
+    async def _admit(self, task: Task) -> None:
+        assert self.scheduler is not None
+        task.status = "queued"
+        depth = self.scheduler.queue_depth
+        waited = await self.scheduler.acquire(task.priority)
+        if self.monitor:
+            self.monitor.record_queue_wait(task.task_id, waited, depth)
+
+    async def _run(
+        self,
+        task: Task,
+        timeout: Optional[float],
+        admitted: bool = False,
+        resume: bool = False,
+    ) -> None:
+        """Run ``task`` to completion, updating its status and metrics.
+
+        ``admitted`` indicates that the caller already holds a scheduler slot,
+        which is released once the task finishes. ``resume`` continues the
+        agent from the task's checkpoint and bypasses caching and coalescing.
+        """
+        key: Optional[str] = None
+        flight: Optional[asyncio.Future] = None
+        inner: Optional[asyncio.Future] = None
+        try:
+            if not resume and self.cache is not None and await self._from_cache(task):
+                return
+            if self.coalesce and not resume:
+                key = self._cache_key(task)
+                leader = self._inflight.get(key)
+                if leader is not None:
+                    # Registered like a leader's run so cancel() reaches it;
+                    # the shielded leader keeps running
+                    inner = asyncio.ensure_future(self._follow(task, leader, timeout))
+                    self._active[task.task_id] = inner
+                    history = await inner
+                    task.result = TaskResult(success=True, history=history)
+                    task.status = "success"
+                    return
+                flight = asyncio.get_running_loop().create_future()
+                # Followers may not exist, so never leave the exception unretrieved
+                flight.add_done_callback(lambda f: f.cancelled() or f.exception())
+                self._inflight[key] = flight
+
+            async def work() -> Any:
+                nonlocal admitted
+                if self.scheduler is not None and not admitted:
+                    await self._admit(task)
+                    admitted = True
+                self.logger.info("Starting task %s: %s", task.task_id, task.description)
+                self._mark_running(task)
+                return await self._call_agent(task, timeout, resume)
+
+            # Run as a separate task so cancel() can stop it without
+            # cancelling the caller awaiting this one
+            inner = asyncio.ensure_future(work())
+            self._active[task.task_id] = inner
+            history = await inner
             task.result = TaskResult(success=True, history=history)
             task.status = "success"
-        except asyncio.TimeoutError:
+            if flight is not None:
+                flight.set_result(history)
+            if self.cache is not None:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.cache.put, self._cache_key(task), history
+                )
+        except asyncio.CancelledError:
+            if inner is not None and not inner.done():
+                # The caller itself was cancelled; take the agent run with it
+                inner.cancel()
+            task.status = "cancelled"
+            task.error = "Task cancelled"
+            self.logger.warning("Task %s cancelled", task.task_id)
+            if task.task_id not in self._cancel_requested:
+                raise
+        except asyncio.TimeoutError as exc:
+            if flight is not None and not flight.done():
+                flight.set_exception(exc)
             task.status = "timeout"
             task.error = "Task timed out"
             self.logger.warning("Task %s timed out", task.task_id)
         except Exception as exc:  # pragma: no cover - safety net
+            if flight is not None and not flight.done():
+                flight.set_exception(exc)
             task.status = "failed"
             task.error = str(exc)
             self.logger.exception("Task %s failed: %s", task.task_id, exc)
         finally:
+            self._active.pop(task.task_id, None)
+            self._cancel_requested.discard(task.task_id)
+            if flight is not None:
+                if not flight.done():
+                    flight.cancel()
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            if admitted:
+                self.scheduler.release()
             task.finished_at = datetime.utcnow()
-            if self.monitor:
+            if self.monitor and task.started_at is not None:
                 duration = (task.finished_at - task.started_at).total_seconds()
                 self.monitor.record_task(task, duration)
+            elif self.monitor and task.status == "cancelled":
+                # Cancelled while still queued
+                self.monitor.record_task(task, 0.0)
+
+    async def execute(
+        self,
+        description: str,
+        timeout: Optional[int] = None,
+        priority: int = PRIORITY_NORMAL,
+        idempotency_key: Optional[str] = None,
+        template: Optional[str] = None,
+    ) -> Task:
+        """Execute a single task.
 
+        Parameters
+        ----------
+        description:
+            Natural language instruction for the agent.
+        timeout:
+            Optional per-task timeout in seconds. Time spent queued is not
+            counted.
+        priority:
+            Scheduling priority used when ``max_concurrency`` is set. Lower
+            values run first.
+        idempotency_key:
+            Key identifying the task in the result cache instead of its
+            description and agent configuration.
+        template:
+            Name of the template ``description`` was rendered from. Used to
+            label metrics.
+
+        Returns
+        -------
+        Task
+            Object containing status, result and metadata.
+        """
+        task = self._new_task(description, priority, idempotency_key, template)
+        await self._run(task, timeout)
         return task
 
-    async def execute_stream(self, description: str, timeout: Optional[int] = None):
+    def cancel(self, task_id: int) -> bool:
+        """Cancel a queued or running task.
+
+        The agent is stopped and its browser session discarded. The task
+        ends with status ``"cancelled"`` and its caller receives it as
+        usual. Returns ``False`` if the task is not active.
+        """
+        inner = self._active.get(task_id)
+        if inner is None or inner.done():
+            return False
+        self._cancel_requested.add(task_id)
+        inner.cancel()
+        return True
+
+    async def resume(self, run_id: str, timeout: Optional[int] = None) -> Task:
+        """Continue a timed out or failed task from its last completed step.
+
+        Requires ``BrowserAgentConfig(checkpoint_path=...)``. The agent gets a
+        fresh browser session, its saved history and a navigation to the page
+        it was on, so completed steps are not run again. ``run_id`` is the
+        :attr:`Task.run_id` of the interrupted task, which may come from
+        another process sharing the checkpoint file.
+
+        Raises
+        ------
+        KeyError
+            If no checkpoint exists for ``run_id``.
+        RuntimeError
+            If the task is still running.
+        """
+        load = getattr(self.agent, "load_checkpoint", None)
+        checkpoint = await load(run_id) if load is not None else None
+        if checkpoint is None:
+            raise KeyError(f"No checkpoint for run {run_id}")
+        task = next((t for t in self.tasks if t.run_id == run_id), None)
+        if task is None:
+            # Checkpoint written by another executor: track it under a new
+            # task ID from this one
+            task = self._new_task(checkpoint.description, PRIORITY_NORMAL)
+            task.run_id = run_id
+        elif task.task_id in self._active:
+            raise RuntimeError(f"Task {task.task_id} is still running")
+        task.status = "pending"
+        task.result = task.error = None
+        task.started_at = task.finished_at = None
+        await self._run(task, timeout, resume=True)
+        return task
+
+    async def execute_stream(
+        self,
+        description: str,
+        timeout: Optional[int] = None,
+        priority: int = PRIORITY_NORMAL,
+        template: Optional[str] = None,
+    ):
         """Execute a task and yield progress updates.
 
         Yields
@@ -157,41 +461,90 @@ class TaskExecutor:
             Progress dictionaries containing ``task_id``, ``status`` and
             optionally ``history`` or ``error``.
         """
-        task = Task(description=description, task_id=len(self.tasks) + 1)
-        self.tasks.append(task)
-        task.status = "running"
-        task.started_at = datetime.utcnow()
-        yield {"task_id": task.task_id, "status": task.status}
+        task = self._new_task(description, priority, template=template)
+        admitted = False
+        try:
+            if self.scheduler is not None:
+                yield {"task_id": task.task_id, "status": "queued"}
+                await self._admit(task)
+                admitted = True
+            yield {"task_id": task.task_id, "status": "running"}
+            handed_over, admitted = admitted, False
+            await self._run(task, timeout, admitted=handed_over)
+        finally:
+            if admitted:
+                self.scheduler.release()
+        update = {"task_id": task.task_id, "status": task.status}
+        if task.result is not None:
+            update["history"] = task.result.history
+        elif task.error and task.status == "failed":
+            update["error"] = task.error
+        yield update
 
+    async def execute_many(
+        self,
+        descriptions: Union[Iterable[str], AsyncIterable[str]],
+        concurrency: int = 8,
+        timeout: Optional[int] = None,
+        priority: int = PRIORITY_NORMAL,
+        progress: Optional[Callable[[BatchProgress], None]] = None,
+        template: Optional[str] = None,
+    ):
+        """Execute many tasks, yielding each :class:`Task` as it completes.
+
+        Parameters
+        ----------
+        descriptions:
+            Iterable or async iterable of instructions. It is consumed lazily,
+            never holding more than ``concurrency`` unfinished tasks.
+        concurrency:
+            Maximum number of tasks from this batch in flight at once.
+        timeout:
+            Optional per-task timeout in seconds.
+        priority:
+            Scheduling priority used when ``max_concurrency`` is set.
+        progress:
+            Callback receiving the updated :class:`BatchProgress` after each
+            task completes.
+        template:
+            Template name used to label metrics of every task in the batch.
+
+        Yields
+        ------
+        Task
+            Finished tasks in completion order.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        stats = BatchProgress()
+        source = _iterate(descriptions).__aiter__()
+        running: Dict[asyncio.Future, Task] = {}
+        exhausted = False
         try:
-            start = time.perf_counter()
-            if 'task_id' in inspect.signature(self.agent.run_task).parameters:
-                history = await asyncio.wait_for(
-                    self.agent.run_task(description, task_id=task.task_id),
-                    timeout=timeout or self.default_timeout,
-                )
-            else:
-                history = await asyncio.wait_for(
-                    self.agent.run_task(description),
-                    timeout=timeout or self.default_timeout,
-                )
-            _ = time.perf_counter() - start
-            task.result = TaskResult(success=True, history=history)
-            task.status = "success"
-            yield {"task_id": task.task_id, "status": task.status, "history": history}
-        except asyncio.TimeoutError:
-            task.status = "timeout"
-            task.error = "Task timed out"
-            yield {"task_id": task.task_id, "status": task.status}
-        except Exception as exc:  # pragma: no cover - safety net
-            task.status = "failed"
-            task.error = str(exc)
-            yield {"task_id": task.task_id, "status": task.status, "error": str(exc)}
+            while True:
+                while not exhausted and len(running) < concurrency:
+                    try:
+                        description = await source.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    task = self._new_task(description, priority, template=template)
+                    running[asyncio.ensure_future(self._run(task, timeout))] = task
+                    stats.submitted += 1
+                if not running:
+                    break
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for fut in done:
+                    task = running.pop(fut)
+                    stats.update(task)
+                    if progress:
+                        progress(stats)
+                    yield task
         finally:
-            task.finished_at = datetime.utcnow()
-            if self.monitor:
-                duration = (task.finished_at - task.started_at).total_seconds()
-                self.monitor.record_task(task, duration)
+            for fut in running:
+                fut.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
 
     def history(self) -> List[Task]:
         """Return the list of executed tasks in order of submission."""
@@ -203,6 +556,8 @@ class TaskExecutor:
         It is safe to call this method multiple times.
         """
         await self.agent.close()
+        if self.monitor:
+            await self.monitor.close()
 
     def export_metrics(self, path: str) -> None:
         """Export collected analytics data to ``path``."""
@@ -0,0 +1,155 @@
+import json
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .templates import TaskTemplate
+
+
+class TemplateStore:
+    """SQLite catalog of templates keyed by name and version.
+
+    Opening a store only connects to the database. Template bodies are read
+    on the first :meth:`get` of each name and version and then kept in
+    memory, so startup cost does not depend on the size of the catalog.
+    Every version ever added is kept, allowing callers to pin a version.
+
+    Parameters
+    ----------
+    path:
+        Database file shared between workers. ``":memory:"`` creates a
+        private, temporary catalog.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS templates (
+                name TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                category TEXT,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (name, version)
+            );
+            CREATE INDEX IF NOT EXISTS templates_category ON templates (category);
+            CREATE TABLE IF NOT EXISTS template_tags (
+                name TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (name, version, tag)
+            );
+            CREATE INDEX IF NOT EXISTS template_tags_tag ON template_tags (tag);
+            """
+        )
+        self._conn.commit()
+        self._loaded: Dict[Tuple[str, int], TaskTemplate] = {}
+
+    def latest_version(self, name: str) -> Optional[int]:
+        row = self._conn.execute(
+            "SELECT MAX(version) FROM templates WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0]
+
+    def versions(self, name: str) -> List[int]:
+        """Return every stored version of ``name`` in ascending order."""
+        rows = self._conn.execute(
+            "SELECT version FROM templates WHERE name = ? ORDER BY version", (name,)
+        )
+        return [r[0] for r in rows]
+
+    def __contains__(self, name: str) -> bool:
+        return self.latest_version(name) is not None
+
+    def _insert(
+        self,
+        template: TaskTemplate,
+        category: Optional[str],
+        tags: Iterable[str],
+    ) -> None:
+        latest = self.latest_version(template.name)
+        if latest is not None and template.version <= latest:
+            raise ValueError("New template version must be greater than existing")
+        template.validate()
+        self._conn.execute(
+            "INSERT INTO templates (name, version, content, category, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (template.name, template.version, template.content, category, time.time()),
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO template_tags (name, version, tag) VALUES (?, ?, ?)",
+            [(template.name, template.version, tag) for tag in tags],
+        )
+
+    def add(
+        self,
+        template: TaskTemplate,
+        category: Optional[str] = None,
+        tags: Iterable[str] = (),
+    ) -> None:
+        """Store a new version of ``template``."""
+        with self._conn:
+            self._insert(template, category, tags)
+
+    def get(self, name: str, version: Optional[int] = None) -> TaskTemplate:
+        """Return ``name`` at ``version``, or its latest version.
+
+        Raises
+        ------
+        KeyError
+            If no such template or version exists.
+        """
+        if version is None:
+            version = self.latest_version(name)
+            if version is None:
+                raise KeyError(name)
+        template = self._loaded.get((name, version))
+        if template is None:
+            row = self._conn.execute(
+                "SELECT content FROM templates WHERE name = ? AND version = ?",
+                (name, version),
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"{name} version {version}")
+            template = TaskTemplate(name=name, content=row[0], version=version)
+            template.compile()
+            self._loaded[(name, version)] = template
+        return template
+
+    def find(self, category: Optional[str] = None, tag: Optional[str] = None) -> List[str]:
+        """Return names whose latest version matches ``category`` and ``tag``."""
+        query = (
+            "SELECT t.name FROM templates t WHERE t.version = "
+            "(SELECT MAX(version) FROM templates WHERE name = t.name)"
+        )
+        params: List[str] = []
+        if category is not None:
+            query += " AND t.category = ?"
+            params.append(category)
+        if tag is not None:
+            query += (
+                " AND EXISTS (SELECT 1 FROM template_tags g WHERE g.name = t.name "
+                "AND g.version = t.version AND g.tag = ?)"
+            )
+            params.append(tag)
+        return [r[0] for r in self._conn.execute(query + " ORDER BY t.name", params)]
+
+    def import_json(self, data: str) -> int:
+        """Add templates from a JSON list in one transaction.
+
+        Items use the :class:`TaskTemplate` fields plus optional ``category``
+        and ``tags``. Returns the number of templates added.
+        """
+        items = json.loads(data)
+        with self._conn:
+            for item in items:
+                item = dict(item)
+                category = item.pop("category", None)
+                tags = item.pop("tags", ())
+                self._insert(TaskTemplate(**item), category, tags)
+        return len(items)
+
+    def close(self) -> None:
+        self._conn.close()
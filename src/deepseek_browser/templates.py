@@ -1,51 +1,222 @@
 import json
 import re
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Set
+from string import Formatter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .template_store import TemplateStore
 
-_VAR_PATTERN = re.compile(r"{(?P<var>[a-zA-Z_][a-zA-Z0-9_]*)}")
+
+_NAME_PATTERN = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
+_FORMATTER = Formatter()
+
+
+class RenderPlan(NamedTuple):
+    """Pre-parsed form of a template.
+
+    ``literals`` has one more item than ``slots``; rendering interleaves
+    them. Templates using format specs, conversions or attribute access are
+    not ``simple`` and fall back to :meth:`str.format`.
+    """
+
+    literals: Tuple[str, ...]
+    slots: Tuple[str, ...]
+    variables: FrozenSet[str]
+    simple: bool
+
+
+def compile_template(content: str) -> RenderPlan:
+    """Parse ``content`` once into a :class:`RenderPlan`."""
+    literals: List[str] = []
+    slots: List[str] = []
+    variables: Set[str] = set()
+    simple = True
+    pending = ""
+    for literal, field_name, format_spec, conversion in _FORMATTER.parse(content):
+        pending += literal
+        if field_name is None:
+            continue
+        name = re.split(r"[.\[]", field_name, maxsplit=1)[0]
+        if not _NAME_PATTERN.fullmatch(name):
+            # Positional fields are kept for str.format to report
+            simple = False
+            continue
+        variables.add(name)
+        if format_spec or conversion or name != field_name:
+            simple = False
+        literals.append(pending)
+        slots.append(name)
+        pending = ""
+    literals.append(pending)
+    return RenderPlan(tuple(literals), tuple(slots), frozenset(variables), simple)
 
 
 @dataclass
 class TaskTemplate:
-    """Template for building task descriptions."""
+    """Template for building task descriptions.
+
+    The template is compiled into a :class:`RenderPlan` on first use and
+    recompiled only when ``content`` or ``version`` change.
+    """
 
     name: str
     content: str
     version: int = 1
 
-    def variables(self) -> Set[str]:
+    def __post_init__(self) -> None:
+        self._plan: Optional[RenderPlan] = None
+        self._plan_content: Optional[str] = None
+        self._plan_version: Optional[int] = None
+
+    def compile(self) -> RenderPlan:
+        """Return the cached render plan, compiling it if needed."""
+        if (
+            self._plan is None
+            or self._plan_content is not self.content
+            or self._plan_version != self.version
+        ):
+            self._plan = compile_template(self.content)
+            self._plan_content = self.content
+            self._plan_version = self.version
+        return self._plan
+
+    def variables(self) -> FrozenSet[str]:
         """Return variables referenced in the template."""
-        return {m.group("var") for m in _VAR_PATTERN.finditer(self.content)}
+        return self.compile().variables
 
     def render(self, **kwargs: str) -> str:
         """Render the template with the provided variables."""
-        missing = self.variables() - kwargs.keys()
-        if missing:
+        plan = self.compile()
+        if not plan.variables.issubset(kwargs):
+            missing = plan.variables - kwargs.keys()
             raise ValueError(f"Missing variables: {', '.join(sorted(missing))}")
-        return self.content.format(**kwargs)
+        return self._fill(plan, kwargs)
+
+    def _fill(self, plan: RenderPlan, kwargs: Mapping[str, Any]) -> str:
+        if not plan.simple:
+            return self.content.format(**kwargs)
+        literals = plan.literals
+        parts = [literals[0]]
+        for i, slot in enumerate(plan.slots, 1):
+            parts.append(format(kwargs[slot], ""))
+            parts.append(literals[i])
+        return "".join(parts)
 
     def validate(self) -> None:
         """Validate that all variables can be rendered."""
         self.render(**{v: "x" for v in self.variables()})
 
 
+@dataclass
+class RenderError:
+    """A row of a :class:`RenderBatch` that could not be rendered."""
+
+    index: int
+    row: Mapping[str, Any]
+    error: str
+
+
+class RenderBatch:
+    """Lazily rendered descriptions for a stream of variable rows.
+
+    Iterating yields one description per successfully rendered row. Rows
+    that fail are skipped and recorded in :attr:`errors`. A batch can only
+    be iterated once.
+    """
+
+    def __init__(
+        self,
+        templates: List[TaskTemplate],
+        rows: Iterable[Mapping[str, Any]],
+        separator: str = " ",
+    ) -> None:
+        self.templates = templates
+        self.rows = rows
+        self.separator = separator
+        self.errors: List[RenderError] = []
+        self.rendered = 0
+
+    def __iter__(self) -> Iterator[str]:
+        plans = [(t, t.compile()) for t in self.templates]
+        required = frozenset().union(*(plan.variables for _, plan in plans))
+        for index, row in enumerate(self.rows):
+            try:
+                if not required.issubset(row):
+                    missing = required - row.keys()
+                    raise ValueError(f"Missing variables: {', '.join(sorted(missing))}")
+                description = self.separator.join(t._fill(plan, row) for t, plan in plans)
+            except Exception as exc:
+                self.errors.append(RenderError(index=index, row=row, error=str(exc)))
+                continue
+            self.rendered += 1
+            yield description
+
+
 class TemplateLibrary:
-    """Collection of named :class:`TaskTemplate` objects."""
+    """Collection of named :class:`TaskTemplate` objects.
 
-    def __init__(self) -> None:
+    Parameters
+    ----------
+    store:
+        Optional :class:`TemplateStore` backing the library. Added templates
+        are written to it and unknown names are loaded from it on first use.
+    """
+
+    def __init__(self, store: Optional["TemplateStore"] = None) -> None:
         self._templates: Dict[str, TaskTemplate] = {}
+        self.store = store
+
+    def _latest_version(self, name: str) -> Optional[int]:
+        if self.store is not None:
+            return self.store.latest_version(name)
+        existing = self._templates.get(name)
+        return existing.version if existing else None
 
-    def add(self, template: TaskTemplate) -> None:
-        existing = self._templates.get(template.name)
-        if existing and template.version <= existing.version:
+    def add(
+        self,
+        template: TaskTemplate,
+        category: Optional[str] = None,
+        tags: Iterable[str] = (),
+    ) -> None:
+        latest = self._latest_version(template.name)
+        if latest is not None and template.version <= latest:
             raise ValueError("New template version must be greater than existing")
+        template.compile()
         template.validate()
+        if self.store is not None:
+            self.store.add(template, category=category, tags=tags)
         self._templates[template.name] = template
 
-    def get(self, template_name: str) -> TaskTemplate:
-        return self._templates[template_name]
+    def get(self, template_name: str, version: Optional[int] = None) -> TaskTemplate:
+        """Return a template, optionally pinned to ``version``.
+
+        Pinned versions other than the latest require a ``store``.
+        """
+        template = self._templates.get(template_name)
+        if template is not None and version in (None, template.version):
+            return template
+        if self.store is None:
+            if version is None:
+                raise KeyError(template_name)
+            raise KeyError(f"{template_name} version {version}")
+        template = self.store.get(template_name, version)
+        if version is None:
+            self._templates[template_name] = template
+        return template
 
     def render(self, template_name: str, **kwargs: str) -> str:
         return self.get(template_name).render(**kwargs)
@@ -55,6 +226,24 @@ class TemplateLibrary:
         rendered = [self.render(n, **kwargs) for n in names]
         return " ".join(rendered)
 
+    def render_many(
+        self,
+        template_name: str,
+        rows: Iterable[Mapping[str, Any]],
+        version: Optional[int] = None,
+    ) -> RenderBatch:
+        """Render ``template_name`` once per row, lazily.
+
+        ``rows`` may be any iterable of mappings, such as a
+        :class:`csv.DictReader` or parsed JSON lines. Extra keys are ignored.
+        ``version`` pins a stored version instead of the latest one.
+        """
+        return RenderBatch([self.get(template_name, version)], rows)
+
+    def compose_many(self, names: List[str], rows: Iterable[Mapping[str, Any]]) -> RenderBatch:
+        """Compose ``names`` once per row, lazily. See :meth:`render_many`."""
+        return RenderBatch([self.get(n) for n in names], rows)
+
     def export_json(self) -> str:
         data = [asdict(t) for t in self._templates.values()]
         return json.dumps(data, indent=2)
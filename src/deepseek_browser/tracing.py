@@ -0,0 +1,238 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .monitoring import Monitor
+
+_current_tracer: ContextVar[Optional["StepTracer"]] = ContextVar("step_tracer", default=None)
+
+
+@dataclass
+class StepSpan:
+    """Timing of a single ``browser_use`` agent step.
+
+    ``start`` and ``end`` are Unix timestamps. ``action_duration`` is the
+    part of the step not spent waiting for the LLM (DOM extraction,
+    navigation and the browser actions themselves).
+    """
+
+    task_id: int
+    step: int
+    start: float
+    end: float
+    llm_latency: float = 0.0
+    llm_calls: int = 0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    action: Optional[str] = None
+    action_duration: float = 0.0
+
+
+def _action_names(item: Any) -> Optional[str]:
+    output = getattr(item, "model_output", None)
+    names = []
+    for action in getattr(output, "action", None) or []:
+        data = action.model_dump(exclude_unset=True) if hasattr(action, "model_dump") else action
+        if isinstance(data, dict):
+            names.extend(k for k, v in data.items() if v is not None)
+    return ",".join(names) or None
+
+
+class StepTracer:
+    """Collect :class:`StepSpan` objects for one task.
+
+    ``on_step_start`` and ``on_step_end`` are passed to ``Agent.run`` as
+    step hooks. LLM timings reach the active tracer through
+    :func:`llm_callback_handler`, which must be registered on the chat model.
+    """
+
+    def __init__(self, task_id: int, monitor: Optional["Monitor"] = None) -> None:
+        self.task_id = task_id
+        self.monitor = monitor
+        self.spans: List[StepSpan] = []
+        self._step = 0
+        self._step_index = 0
+        self._step_start = 0.0
+        self._step_perf = 0.0
+        self._llm_started: Dict[Any, float] = {}
+        self._reset_llm()
+
+    def _reset_llm(self) -> None:
+        self._llm_latency = 0.0
+        self._llm_calls = 0
+        self._prompt_tokens: Optional[int] = None
+        self._completion_tokens: Optional[int] = None
+
+    @contextmanager
+    def activate(self):
+        """Route LLM callbacks made in this context to the tracer."""
+        token = _current_tracer.set(self)
+        try:
+            yield self
+        finally:
+            _current_tracer.reset(token)
+
+    async def on_step_start(self, agent: Any) -> None:
+        self._step += 1
+        state = getattr(agent, "state", None)
+        self._step_index = getattr(state, "n_steps", self._step)
+        self._step_start = time.time()
+        self._step_perf = time.perf_counter()
+        self._reset_llm()
+
+    async def on_step_end(self, agent: Any) -> None:
+        duration = time.perf_counter() - self._step_perf
+        history = getattr(getattr(getattr(agent, "state", None), "history", None), "history", None)
+        item = history[-1] if history else None
+        prompt_tokens = self._prompt_tokens
+        if prompt_tokens is None and item is not None:
+            prompt_tokens = getattr(getattr(item, "metadata", None), "input_tokens", None)
+        span = StepSpan(
+            task_id=self.task_id,
+            step=self._step_index,
+            start=self._step_start,
+            end=self._step_start + duration,
+            llm_latency=self._llm_latency,
+            llm_calls=self._llm_calls,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=self._completion_tokens,
+            action=_action_names(item),
+            action_duration=max(duration - self._llm_latency, 0.0),
+        )
+        self.spans.append(span)
+        if self.monitor:
+            self.monitor.record_step(span)
+
+    def llm_start(self, run_id: Any) -> None:
+        self._llm_started[run_id] = time.perf_counter()
+
+    def llm_end(
+        self,
+        run_id: Any,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+    ) -> None:
+        started = self._llm_started.pop(run_id, None)
+        if started is None:
+            return
+        self._llm_latency += time.perf_counter() - started
+        self._llm_calls += 1
+        if prompt_tokens is not None:
+            self._prompt_tokens = (self._prompt_tokens or 0) + prompt_tokens
+        if completion_tokens is not None:
+            self._completion_tokens = (self._completion_tokens or 0) + completion_tokens
+
+
+def _token_usage(response: Any) -> Tuple[Optional[int], Optional[int]]:
+    prompt = completion = None
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            info = getattr(generation, "generation_info", None) or {}
+            if usage:
+                p, c = usage.get("input_tokens"), usage.get("output_tokens")
+            else:
+                p, c = info.get("prompt_eval_count"), info.get("eval_count")
+            if p is not None:
+                prompt = (prompt or 0) + p
+            if c is not None:
+                completion = (completion or 0) + c
+    return prompt, completion
+
+
+_handler_class = None
+
+
+def llm_callback_handler() -> Any:
+    """Return a LangChain callback handler reporting LLM calls to the active tracer."""
+    global _handler_class
+    if _handler_class is None:
+        from langchain_core.callbacks import BaseCallbackHandler
+
+        class LLMTimingHandler(BaseCallbackHandler):
+            # Run in the caller's context so the active tracer is visible
+            run_inline = True
+
+            def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+                tracer = _current_tracer.get()
+                if tracer is not None:
+                    tracer.llm_start(run_id)
+
+            def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+                tracer = _current_tracer.get()
+                if tracer is not None:
+                    tracer.llm_start(run_id)
+
+            def on_llm_end(self, response, *, run_id, **kwargs):
+                tracer = _current_tracer.get()
+                if tracer is not None:
+                    tracer.llm_end(run_id, *_token_usage(response))
+
+            def on_llm_error(self, error, *, run_id, **kwargs):
+                tracer = _current_tracer.get()
+                if tracer is not None:
+                    tracer.llm_end(run_id)
+
+        _handler_class = LLMTimingHandler
+    return _handler_class()
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        wrapped = {"boolValue": value}
+    elif isinstance(value, int):
+        wrapped = {"intValue": str(value)}
+    elif isinstance(value, float):
+        wrapped = {"doubleValue": value}
+    else:
+        wrapped = {"stringValue": str(value)}
+    return {"key": key, "value": wrapped}
+
+
+def spans_to_otel(
+    spans: Iterable[StepSpan],
+    trace_seed: int = 0,
+    service_name: str = "deepseek-browser",
+) -> Dict[str, Any]:
+    """Convert spans to the OpenTelemetry OTLP/JSON trace format.
+
+    Every task becomes one trace whose ID combines ``trace_seed`` and the
+    task ID, with one ``agent.step`` span per step.
+    """
+    otel_spans = []
+    for span in spans:
+        attributes = {
+            "task.id": span.task_id,
+            "agent.step": span.step,
+            "llm.latency_s": span.llm_latency,
+            "llm.calls": span.llm_calls,
+            "browser.action.duration_s": span.action_duration,
+        }
+        if span.prompt_tokens is not None:
+            attributes["gen_ai.usage.input_tokens"] = span.prompt_tokens
+        if span.completion_tokens is not None:
+            attributes["gen_ai.usage.output_tokens"] = span.completion_tokens
+        if span.action is not None:
+            attributes["browser.action"] = span.action
+        otel_spans.append(
+            {
+                "traceId": f"{trace_seed & (2**64 - 1):016x}{span.task_id & (2**64 - 1):016x}",
+                "spanId": f"{span.task_id & 0xFFFFFFFF:08x}{span.step & 0xFFFFFFFF:08x}",
+                "name": "agent.step",
+                "kind": 1,
+                "startTimeUnixNano": str(int(span.start * 1e9)),
+                "endTimeUnixNano": str(int(span.end * 1e9)),
+                "attributes": [_attribute(k, v) for k, v in attributes.items()],
+            }
+        )
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [_attribute("service.name", service_name)]},
+                "scopeSpans": [{"scope": {"name": "deepseek_browser"}, "spans": otel_spans}],
+            }
+        ]
+    }
@@ -5,6 +5,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..",
 
 """Testing utilities and stub modules for optional dependencies."""
 
+import json
 import types
 
 if "browser_use" not in sys.modules:
@@ -28,18 +29,25 @@ if "browser_use" not in sys.modules:
         async def kill(self):
             self._connected = False
 
+        async def navigate_to(self, url):
+            self.current_url = url
+
         def is_connected(self) -> bool:
             return self._connected
 
     class Agent:  # type: ignore
-        def __init__(self, task, llm=None, browser_session=None):
+        def __init__(self, task, llm=None, browser_session=None, **kwargs):
             self.task = task
             self.llm = llm
             self.browser_session = browser_session
+            self.kwargs = kwargs
 
-        async def run(self):
+        async def run(self, max_steps=100, on_step_start=None, on_step_end=None):
             return [f"handled {self.task}"]
 
+        def stop(self):
+            self.stopped = True
+
     logging_config = types.ModuleType("browser_use.logging_config")
 
     def setup_logging():
@@ -47,6 +55,23 @@ if "browser_use" not in sys.modules:
 
     logging_config.setup_logging = setup_logging
 
+    agent_views = types.ModuleType("browser_use.agent.views")
+
+    class AgentState:  # type: ignore
+        def __init__(self, **data):
+            self.__dict__.update(data)
+
+        @classmethod
+        def model_validate_json(cls, data):
+            return cls(**json.loads(data))
+
+        def model_dump_json(self):
+            return json.dumps(self.__dict__)
+
+    agent_views.AgentState = AgentState
+    sys.modules["browser_use.agent"] = types.ModuleType("browser_use.agent")
+    sys.modules["browser_use.agent.views"] = agent_views
+
     browser_use.Agent = Agent
     browser_use.BrowserProfile = BrowserProfile
     browser_use.BrowserSession = BrowserSession
@@ -59,10 +84,11 @@ if "langchain_ollama" not in sys.modules:
     langchain_ollama = types.ModuleType("langchain_ollama")
 
     class ChatOllama:  # type: ignore
-        def __init__(self, model: str, base_url: str, temperature: float):
+        def __init__(self, model: str, base_url: str, temperature: float, **kwargs):
             self.model = model
             self.base_url = base_url
             self.temperature = temperature
+            self.kwargs = kwargs
 
     langchain_ollama.ChatOllama = ChatOllama
     sys.modules["langchain_ollama"] = langchain_ollama
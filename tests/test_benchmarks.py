@@ -0,0 +1,42 @@
+import pytest
+
+from benchmarks.harness import BenchmarkResult, compare, load_results, percentile, write_results
+from benchmarks.suite import run_all
+
+
+def results(**values):
+    return {
+        "benchmarks": {
+            name: {"value": value, "higher_is_better": name.startswith("throughput")}
+            for name, value in values.items()
+        }
+    }
+
+
+def test_percentile_interpolates():
+    assert percentile([1, 2, 3, 4], 0.5) == 2.5
+    assert percentile([5], 0.99) == 5
+
+
+def test_compare_orients_change_and_applies_thresholds():
+    baseline = results(latency=1.0, throughput_c8=100.0, removed=1.0)
+    current = results(latency=1.15, throughput_c8=80.0)
+    by_name = {c.name: c for c in compare(current, baseline, 0.10, {"latency": 0.2})}
+    assert set(by_name) == {"latency", "throughput_c8"}
+    assert by_name["latency"].change == pytest.approx(0.15)
+    assert not by_name["latency"].regressed
+    assert by_name["throughput_c8"].change == pytest.approx(0.2)
+    assert by_name["throughput_c8"].regressed
+
+
+def test_results_round_trip(tmp_path):
+    path = str(tmp_path / "bench.json")
+    write_results(path, [BenchmarkResult.from_samples("overhead", [0.1, 0.2, 0.3])])
+    data = load_results(path)
+    assert data["benchmarks"]["overhead"]["value"] == pytest.approx(0.2)
+    assert data["benchmarks"]["overhead"]["samples"] == 3
+
+
+def test_suite_runs_scaled_down():
+    names = [r.name for r in run_all(scale=0.001, only=["executor_overhead", "template_render"])]
+    assert names == ["executor_overhead", "template_render"]
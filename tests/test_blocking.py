@@ -0,0 +1,130 @@
+import asyncio
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+from browser_use import BrowserSession
+
+from deepseek_browser.blocking import BLOCKING_PRESETS, BlockingProfile, RequestBlocker, resolve_blocking
+from deepseek_browser.cache import config_fingerprint
+from deepseek_browser.monitoring import Monitor
+from ollama_config import BrowserAgent, BrowserAgentConfig
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = SimpleNamespace(resource_type=resource_type, url=url)
+        self.outcome = None
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+    async def abort(self, error_code=None):
+        self.outcome = "aborted"
+
+
+class FakeContext:
+    def __init__(self):
+        self.handlers = []
+
+    async def route(self, pattern, handler):
+        self.handlers.append((pattern, handler))
+
+
+class RoutedSession(BrowserSession):
+    def __init__(self, browser_profile=None):
+        super().__init__(browser_profile)
+        self.browser_context = FakeContext()
+
+
+def test_profile_matches_types_and_subdomains():
+    profile = BLOCKING_PRESETS["media"]
+    assert profile.blocks("image", "https://example.com/a.png")
+    assert profile.blocks("script", "https://www.google-analytics.com/ga.js")
+    assert not profile.blocks("script", "https://example.com/app.js")
+    assert not profile.blocks("document", "https://example.com/")
+    assert not BlockingProfile(resource_types=frozenset({"document"})).blocks("document", "https://a.com/")
+    with pytest.raises(ValueError):
+        resolve_blocking("everything")
+
+
+def test_blocker_aborts_and_counts_bytes():
+    monitor = Monitor()
+    blocker = RequestBlocker(BLOCKING_PRESETS["text"], monitor)
+    routes = [
+        FakeRoute("image", "https://example.com/a.png"),
+        FakeRoute("stylesheet", "https://example.com/a.css"),
+        FakeRoute("document", "https://example.com/"),
+    ]
+
+    async def run():
+        for route in routes:
+            await blocker.handle(route)
+
+    asyncio.run(run())
+    assert [r.outcome for r in routes] == ["aborted", "aborted", "continued"]
+    assert monitor.counters["blocked_requests"] == 2
+    assert monitor.counters["blocked_bytes_estimate"] == 60_000
+
+
+def test_template_override_selects_profile(monkeypatch):
+    monkeypatch.setattr("ollama_config.BrowserSession", RoutedSession)
+    config = BrowserAgentConfig(
+        block_resources="trackers",
+        template_blocking={"news_summarization": "text"},
+    )
+
+    async def run():
+        agent = BrowserAgent(config)
+        await agent.create_agent()
+        session = agent.browser_session
+        blocker = agent._blockers[id(session)]
+        await agent.run_task("summarize", template="news_summarization")
+        news = blocker.profile
+        await agent.run_task("search")
+        default = blocker.profile
+        await agent.close()
+        return session, news, default
+
+    session, news, default = asyncio.run(run())
+    assert [pattern for pattern, _ in session.browser_context.handlers] == ["**/*"]
+    assert news is BLOCKING_PRESETS["text"]
+    assert default is BLOCKING_PRESETS["trackers"]
+
+
+def test_no_routing_without_blocking(monkeypatch):
+    monkeypatch.setattr("ollama_config.BrowserSession", RoutedSession)
+
+    async def run():
+        agent = BrowserAgent(BrowserAgentConfig())
+        await agent.create_agent()
+        session = agent.browser_session
+        await agent.close()
+        return session
+
+    # Routing turns off the browser cache, so it is only set up when needed
+    assert asyncio.run(run()).browser_context.handlers == []
+
+
+def test_blocking_config_fingerprint_is_stable():
+    script = (
+        "from deepseek_browser.cache import config_fingerprint;"
+        "from ollama_config import BrowserAgentConfig;"
+        "print(config_fingerprint(BrowserAgentConfig(block_resources='text')))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.path.join(root, "src")]))
+    fingerprints = set()
+    for seed in ("1", "2", "3"):
+        env["PYTHONHASHSEED"] = seed
+        out = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+        fingerprints.add(out.stdout.strip())
+    assert len(fingerprints) == 1
+    by_name = BrowserAgentConfig(block_resources="text", template_blocking={"news": "media"})
+    by_profile = BrowserAgentConfig(
+        block_resources=BLOCKING_PRESETS["text"],
+        template_blocking={"news": BLOCKING_PRESETS["media"]},
+    )
+    assert config_fingerprint(by_name) == config_fingerprint(by_profile)
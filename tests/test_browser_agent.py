@@ -5,6 +5,7 @@ import pytest
 from ollama_config import BrowserAgent, BrowserAgentConfig
 from browser_use import Agent, BrowserSession
 from langchain_ollama import ChatOllama
+from deepseek_browser.monitoring import Monitor
 
 
 class DummyAgent(Agent):
@@ -80,3 +81,332 @@ def test_run_task_reconnect(monkeypatch, browser_config):
     assert result == ["done"]
     assert calls["count"] == 1
     asyncio.run(agent.close())
+
+
+def test_pool_runs_tasks_on_separate_sessions(monkeypatch):
+    seen = []
+
+    class RecordingAgent(Agent):
+        async def run(self):
+            seen.append(self.browser_session)
+            await asyncio.sleep(0.01)
+            return ["ok"]
+
+    monkeypatch.setattr("ollama_config.Agent", RecordingAgent)
+
+    async def run():
+        agent = BrowserAgent(BrowserAgentConfig(pool_size=2))
+        await agent.create_agent()
+        results = await asyncio.gather(agent.run_task("a"), agent.run_task("b"))
+        available = agent.pool.available
+        await agent.close()
+        return results, available
+
+    results, available = asyncio.run(run())
+    assert results == [["ok"], ["ok"]]
+    assert len(seen) == 2 and seen[0] is not seen[1]
+    assert available == 2
+
+
+def test_pool_replaces_disconnected_session(monkeypatch):
+    class CrashingAgent(Agent):
+        async def run(self):
+            await self.browser_session.stop()
+            return ["ok"]
+
+    monkeypatch.setattr("ollama_config.Agent", CrashingAgent)
+
+    async def run():
+        agent = BrowserAgent(BrowserAgentConfig(pool_size=2))
+        await agent.create_agent()
+        await agent.run_task("crash")
+        session = await agent.pool.acquire()
+        other = await agent.pool.acquire()
+        connected = session.is_connected() and other.is_connected()
+        await agent.close()
+        return connected
+
+    assert asyncio.run(run())
+
+
+def test_llm_pool_spreads_tasks_across_endpoints(monkeypatch):
+    seen = []
+
+    class RecordingAgent(Agent):
+        async def run(self):
+            seen.append(self.llm.base_url)
+            await asyncio.sleep(0.01)
+            return ["ok"]
+
+    monkeypatch.setattr("ollama_config.Agent", RecordingAgent)
+    urls = ["http://a:11434", "http://b:11434"]
+
+    async def run():
+        agent = BrowserAgent(BrowserAgentConfig(ollama_urls=urls, pool_size=2))
+        await agent.create_agent()
+        await asyncio.gather(agent.run_task("a"), agent.run_task("b"))
+        outstanding = [e.outstanding for e in agent.llm_pool.endpoints]
+        await agent.close()
+        return outstanding
+
+    assert asyncio.run(run()) == [0, 0]
+    assert sorted(seen) == urls
+
+
+class WarmingChatOllama(ChatOllama):
+    calls = []
+
+    async def ainvoke(self, prompt, **kwargs):
+        self.calls.append((self.base_url, kwargs))
+        if self.base_url.startswith("http://down"):
+            raise ConnectionError("refused")
+        return "OK"
+
+
+def test_warm_up_preloads_model_and_browser(monkeypatch):
+    monkeypatch.setattr("ollama_config.ChatOllama", WarmingChatOllama)
+    WarmingChatOllama.calls = []
+    monitor = Monitor()
+
+    async def run():
+        config = BrowserAgentConfig(warm_up=True, keep_alive="30m")
+        agent = BrowserAgent(config, monitor=monitor)
+        await agent.create_agent()
+        url = agent.browser_session.current_url
+        llm = agent.llm
+        await agent.close()
+        return llm, url
+
+    llm, url = asyncio.run(run())
+    assert url == "about:blank"
+    assert llm.kwargs["keep_alive"] == "30m"
+    assert WarmingChatOllama.calls == [("http://localhost:11434", {"options": {"num_predict": 1}})]
+    assert sorted(w.component for w in monitor.warmups) == ["browser", "model"]
+    assert all(w.error is None for w in monitor.warmups)
+
+
+def test_reopened_agent_warms_up_again(monkeypatch):
+    monkeypatch.setattr("ollama_config.ChatOllama", WarmingChatOllama)
+    WarmingChatOllama.calls = []
+
+    async def run():
+        agent = BrowserAgent(BrowserAgentConfig(warm_up=True))
+        await agent.create_agent()
+        await agent.close()
+        await agent.create_agent()
+        await agent.close()
+
+    asyncio.run(run())
+    assert len(WarmingChatOllama.calls) == 2
+
+
+def test_warm_up_failure_does_not_block_start(monkeypatch):
+    monkeypatch.setattr("ollama_config.ChatOllama", WarmingChatOllama)
+    monitor = Monitor()
+
+    async def run():
+        agent = BrowserAgent(
+            BrowserAgentConfig(ollama_url="http://down:11434", warm_up=True), monitor=monitor
+        )
+        await agent.create_agent()
+        connected = agent.browser_session.is_connected()
+        await agent.close()
+        return connected
+
+    assert asyncio.run(run())
+    model = [w for w in monitor.warmups if w.component == "model"]
+    assert model[0].error == "refused"
+
+
+def test_standby_session_replaces_failed_browser(monkeypatch):
+    calls = {"count": 0}
+    sessions = []
+
+    class FlakyAgent(Agent):
+        async def run(self):
+            calls["count"] += 1
+            sessions.append(self.browser_session)
+            if calls["count"] == 1:
+                await self.browser_session.stop()
+                raise RuntimeError("browser crashed")
+            return ["ok"]
+
+    monkeypatch.setattr("ollama_config.Agent", FlakyAgent)
+    monitor = Monitor()
+
+    async def run():
+        agent = BrowserAgent(BrowserAgentConfig(standby_session=True), monitor=monitor)
+        await agent.create_agent()
+        llm = agent.llm
+        standby = await agent._standby
+        result = await agent.run_task("retry")
+        replaced = agent.browser_session is standby and agent.llm is llm
+        refilled = agent._standby is not None
+        await agent.close()
+        return result, replaced, refilled, agent._standby
+
+    result, replaced, refilled, standby_after_close = asyncio.run(run())
+    assert result == ["ok"]
+    assert replaced and refilled
+    assert standby_after_close is None
+    assert not sessions[0].is_connected()
+    assert monitor.counters["standby_sessions_used"] == 1
+
+
+class ConnectError(Exception):
+    """Stands in for httpx.ConnectError raised when Ollama is down."""
+
+
+def test_llm_failure_keeps_session_and_backs_off(monkeypatch):
+    from deepseek_browser.retry import LLM_UNAVAILABLE, RetryPolicy
+
+    sessions = []
+
+    class OllamaDownOnce(Agent):
+        async def run(self):
+            sessions.append(self.browser_session)
+            if len(sessions) == 1:
+                raise ConnectError("connection refused")
+            return ["ok"]
+
+    monkeypatch.setattr("ollama_config.Agent", OllamaDownOnce)
+    monitor = Monitor()
+    policies = {LLM_UNAVAILABLE: RetryPolicy(max_retries=2, base_delay=0.01)}
+
+    async def run():
+        agent = BrowserAgent(BrowserAgentConfig(retry_policies=policies), monitor=monitor)
+        await agent.create_agent()
+        result = await agent.run_task("task")
+        await agent.close()
+        return result
+
+    assert asyncio.run(run()) == ["ok"]
+    assert sessions[0] is sessions[1]
+    assert monitor.counters["failures_llm_unavailable"] == 1
+
+
+def test_open_circuit_fails_fast_without_browser(monkeypatch):
+    from deepseek_browser.retry import CircuitOpenError
+
+    class OllamaDown(Agent):
+        async def run(self):
+            raise ConnectError("connection refused")
+
+    monkeypatch.setattr("ollama_config.Agent", OllamaDown)
+    monitor = Monitor()
+    config = BrowserAgentConfig(breaker_threshold=1, breaker_reset=60)
+
+    async def run():
+        agent = BrowserAgent(config, monitor=monitor)
+        await agent.create_agent()
+        # The retry after the first failure is already rejected
+        with pytest.raises(CircuitOpenError):
+            await agent.run_task("first")
+        checkouts = []
+        original = agent._checkout_session
+
+        async def counting():
+            checkouts.append(1)
+            return await original()
+
+        agent._checkout_session = counting
+        with pytest.raises(CircuitOpenError):
+            await agent.run_task("second")
+        await agent.close()
+        return checkouts
+
+    assert asyncio.run(run()) == []
+    assert monitor.counters["circuit_open_rejections"] == 2
+
+
+def test_browser_failures_leave_breaker_alone(monkeypatch):
+    from deepseek_browser.retry import DEFAULT_RETRY_POLICIES, RetryPolicy
+
+    class Mixed(Agent):
+        async def run(self):
+            if self.task == "llm":
+                raise ConnectError("connection refused")
+            raise ValueError("element not found")
+
+    monkeypatch.setattr("ollama_config.Agent", Mixed)
+    policies = {name: RetryPolicy(max_retries=0) for name in DEFAULT_RETRY_POLICIES}
+    config = BrowserAgentConfig(breaker_threshold=2, retry_policies=policies)
+
+    async def run():
+        agent = BrowserAgent(config)
+        await agent.create_agent()
+        for task in ("llm", "page", "llm"):
+            with pytest.raises(Exception):
+                await agent.run_task(task)
+        state = agent.breaker.state
+        await agent.close()
+        return state
+
+    # The task error in between does not reset the LLM failure count
+    assert asyncio.run(run()) == "open"
+
+
+def test_llm_pool_only_counts_llm_failures(monkeypatch):
+    class BrokenTask(Agent):
+        async def run(self):
+            raise ValueError("element not found")
+
+    monkeypatch.setattr("ollama_config.Agent", BrokenTask)
+    config = BrowserAgentConfig(ollama_urls=["http://a:11434", "http://b:11434"], retries=3)
+
+    async def run():
+        agent = BrowserAgent(config)
+        await agent.create_agent()
+        with pytest.raises(ValueError):
+            await agent.run_task("task")
+        failures = [e.failures for e in agent.llm_pool.endpoints]
+        await agent.close()
+        return failures
+
+    assert asyncio.run(run()) == [0, 0]
+
+
+def test_failed_task_keeps_session_shared_with_running_task(monkeypatch):
+    from deepseek_browser.retry import NAVIGATION_TIMEOUT, RetryPolicy
+
+    class SharedAgent(Agent):
+        async def run(self, **kwargs):
+            if self.task == "fail":
+                raise TimeoutError("Navigation timeout")
+            await asyncio.sleep(0.1)
+            return [self.browser_session.is_connected()]
+
+    monkeypatch.setattr("ollama_config.Agent", SharedAgent)
+    policies = {NAVIGATION_TIMEOUT: RetryPolicy(max_retries=0, discard_session=True)}
+
+    async def run():
+        agent = BrowserAgent(BrowserAgentConfig(retry_policies=policies))
+        await agent.create_agent()
+        session = agent.browser_session
+        slow = asyncio.ensure_future(agent.run_task("slow"))
+        await asyncio.sleep(0.02)
+        with pytest.raises(TimeoutError):
+            await agent.run_task("fail")
+        result = await slow
+        await agent.close()
+        return result
+
+    assert asyncio.run(run()) == [True]
+
+
+def test_discarding_old_session_spares_its_replacement():
+    async def run():
+        agent = BrowserAgent(BrowserAgentConfig())
+        await agent.create_agent()
+        old = agent.browser_session
+        replacement = BrowserSession()
+        await replacement.start()
+        agent.browser_session = replacement
+        await agent._checkin_session(old, discard=True)
+        state = (old.is_connected(), replacement.is_connected(), agent.browser_session)
+        await agent.close()
+        return state, replacement
+
+    (old_connected, new_connected, current), replacement = asyncio.run(run())
+    assert not old_connected and new_connected
+    assert current is replacement
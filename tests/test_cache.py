@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+from deepseek_browser.cache import ResultCache, cache_key
+from deepseek_browser.task_executor import TaskExecutor
+from ollama_config import BrowserAgentConfig
+
+
+class CountingAgent:
+    def __init__(self):
+        self.config = BrowserAgentConfig()
+        self.calls = 0
+
+    async def create_agent(self):
+        pass
+
+    async def run_task(self, description: str):
+        self.calls += 1
+        return [f"done {description}"]
+
+    async def close(self):
+        pass
+
+
+def test_cache_key_normalizes_and_tracks_config():
+    config = BrowserAgentConfig()
+    assert cache_key("find  news\n", config) == cache_key("find news", config)
+    assert cache_key("find news", config) != cache_key(
+        "find news", BrowserAgentConfig(model_name="other")
+    )
+    assert cache_key("a", config, "key") == cache_key("b", None, "key")
+
+
+def test_result_cache_ttl_and_lru(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.db"), ttl=60, max_entries=2)
+    cache.put("a", [1])
+    cache.put("b", [2])
+    assert cache.get("a") == [1]
+    time.sleep(0.01)
+    cache.put("c", [3])
+    assert cache.get("b") is None
+    assert len(cache) == 2
+    cache.close()
+
+    reopened = ResultCache(str(tmp_path / "cache.db"), ttl=0)
+    assert reopened.get("a") == [1]
+    reopened.put("d", [4])
+    assert reopened.get("d") is None
+    reopened.close()
+
+
+def test_executor_serves_repeated_tasks_from_cache():
+    agent = CountingAgent()
+
+    async def run():
+        executor = TaskExecutor(agent=agent, cache=ResultCache())
+        first = await executor.execute("summarize news")
+        second = await executor.execute("summarize   news")
+        keyed = await executor.execute("other", idempotency_key="k")
+        again = await executor.execute("other wording", idempotency_key="k")
+        return executor.monitor, first, second, keyed, again
+
+    monitor, first, second, keyed, again = asyncio.run(run())
+    assert agent.calls == 2
+    assert not first.result.cached
+    assert second.result.cached and second.result.history == first.result.history
+    assert again.result.history == keyed.result.history
+    assert monitor.counters["result_cache_hits"] == 2
+    assert monitor.counters["result_cache_misses"] == 2
+
+
+class ThreadRecordingCache(ResultCache):
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def get(self, key, default=None):
+        self.threads.add(threading.get_ident())
+        return super().get(key, default)
+
+    def put(self, key, value):
+        self.threads.add(threading.get_ident())
+        super().put(key, value)
+
+
+def test_executor_cache_io_runs_off_the_event_loop():
+    cache = ThreadRecordingCache()
+
+    async def run():
+        executor = TaskExecutor(agent=CountingAgent(), cache=cache)
+        await executor.execute("summarize news")
+        await executor.execute("summarize news")
+
+    asyncio.run(run())
+    assert cache.threads and threading.get_ident() not in cache.threads
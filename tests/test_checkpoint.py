@@ -0,0 +1,130 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from browser_use import Agent
+
+from deepseek_browser.checkpoint import Checkpoint, CheckpointStore
+from deepseek_browser.task_executor import TaskExecutor
+from ollama_config import BrowserAgentConfig
+
+
+class FakeState:
+    """Mimics the parts of browser_use's AgentState used for checkpoints."""
+
+    def __init__(self, urls):
+        self.urls = list(urls)
+        self.n_steps = len(urls)
+        self.history = SimpleNamespace(
+            history=[SimpleNamespace(state=SimpleNamespace(url=u)) for u in urls]
+        )
+
+    def model_dump_json(self):
+        return json.dumps({"urls": self.urls})
+
+
+class SteppingAgent(Agent):
+    """Takes five steps; the first run hangs before step four."""
+
+    starts = []
+    hang = True
+
+    async def run(self, on_step_start=None, on_step_end=None, **kwargs):
+        resumed = self.kwargs.get("injected_agent_state")
+        urls = list(resumed.urls) if resumed else []
+        self.starts.append((len(urls), self.kwargs.get("initial_actions")))
+        while len(urls) < 5:
+            if self.hang and len(urls) == 3:
+                await asyncio.sleep(10)
+            urls.append(f"http://site/page{len(urls)}")
+            self.state = FakeState(urls)
+            await on_step_end(self)
+        return urls
+
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    store = CheckpointStore(path)
+    store.save(Checkpoint(run_id="r1", description="scrape", step=2, state="{}", url="http://a"))
+    store.close()
+    reopened = CheckpointStore(path)
+    checkpoint = reopened.load("r1")
+    assert (checkpoint.step, checkpoint.url) == (2, "http://a")
+    reopened.delete("r1")
+    assert reopened.load("r1") is None
+
+
+def test_store_purges_expired_checkpoints(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    store = CheckpointStore(path, max_age=60)
+    store.save(Checkpoint(run_id="old", description="scrape", step=1, state="{}"))
+    store.save(Checkpoint(run_id="new", description="scrape", step=1, state="{}"))
+    # Age the first run as if it failed long ago and was never resumed
+    store._conn.execute("UPDATE checkpoints SET updated_at = 0 WHERE run_id = 'old'")
+    store._conn.commit()
+    assert store.load("old") is None
+    store.close()
+    reopened = CheckpointStore(path, max_age=60)
+    count = reopened._conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+    assert count == 1 and reopened.load("new") is not None
+
+
+def test_resume_continues_after_timeout(monkeypatch, tmp_path):
+    monkeypatch.setattr("ollama_config.Agent", SteppingAgent)
+    SteppingAgent.starts = []
+    SteppingAgent.hang = True
+    config = BrowserAgentConfig(checkpoint_path=str(tmp_path / "checkpoints.db"))
+
+    async def run():
+        executor = TaskExecutor(config)
+        await executor.start()
+        task = await executor.execute("scrape five pages", timeout=0.2)
+        status = task.status
+        SteppingAgent.hang = False
+        resumed = await executor.resume(task.run_id)
+        leftover = await executor.agent.load_checkpoint(task.run_id)
+        with pytest.raises(KeyError):
+            await executor.resume(task.run_id)
+        await executor.close()
+        return status, resumed, leftover
+
+    status, task, leftover = asyncio.run(run())
+    assert status == "timeout"
+    assert task.status == "success"
+    assert task.result.history == [f"http://site/page{i}" for i in range(5)]
+    assert SteppingAgent.starts == [
+        (0, None),
+        (3, [{"go_to_url": {"url": "http://site/page2"}}]),
+    ]
+    assert leftover is None
+
+
+def test_resume_run_from_another_executor(monkeypatch, tmp_path):
+    monkeypatch.setattr("ollama_config.Agent", SteppingAgent)
+    SteppingAgent.starts = []
+    SteppingAgent.hang = True
+    config = BrowserAgentConfig(checkpoint_path=str(tmp_path / "checkpoints.db"))
+
+    async def run():
+        first = TaskExecutor(config)
+        await first.start()
+        interrupted = await first.execute("scrape five pages", timeout=0.2)
+        await first.close()
+        # The closed agent reopens its store on demand
+        saved = await first.agent.load_checkpoint(interrupted.run_id)
+
+        SteppingAgent.hang = False
+        second = TaskExecutor(config)
+        await second.start()
+        # Same task ID in a new executor, but a different run
+        fresh = await second.execute("another task")
+        resumed = await second.resume(interrupted.run_id)
+        await second.close()
+        return interrupted, saved, fresh, resumed
+
+    interrupted, saved, fresh, resumed = asyncio.run(run())
+    assert interrupted.status == "timeout" and saved.step == 3
+    assert fresh.task_id == interrupted.task_id == 1
+    assert resumed.status == "success" and resumed.task_id == 2
+    assert resumed.run_id == interrupted.run_id
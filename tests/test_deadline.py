@@ -0,0 +1,137 @@
+import asyncio
+
+from browser_use import Agent
+
+from deepseek_browser.deadline import DeadlineGuard
+from deepseek_browser.task_executor import TaskExecutor
+from ollama_config import BrowserAgentConfig
+
+
+class SteppingAgent(Agent):
+    """Takes 50ms steps until stopped."""
+
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stopped = False
+        self.steps = 0
+        self.instances.append(self)
+
+    async def run(self, max_steps=100, on_step_start=None, on_step_end=None):
+        while not self.stopped and self.steps < max_steps:
+            if on_step_start:
+                await on_step_start(self)
+            if self.stopped:
+                break
+            await asyncio.sleep(0.05)
+            self.steps += 1
+        return [f"handled {self.task}"]
+
+
+def test_guard_limits_steps_to_remaining_time():
+    async def run():
+        loop = asyncio.get_running_loop()
+        guard = DeadlineGuard(loop.time() + 1.0, step_seconds=0.3)
+        unknown = DeadlineGuard(loop.time() + 1.0)
+        return guard.max_steps(), unknown.max_steps()
+
+    assert asyncio.run(run()) == (3, None)
+
+
+def test_deadline_stops_agent_between_steps(monkeypatch):
+    monkeypatch.setattr("ollama_config.Agent", SteppingAgent)
+    SteppingAgent.instances = []
+
+    async def run():
+        executor = TaskExecutor(BrowserAgentConfig())
+        await executor.start()
+        task = await executor.execute("crawl", timeout=0.4)
+        session = executor.agent.browser_session
+        await executor.close()
+        return task, session
+
+    task, session = asyncio.run(run())
+    agent = SteppingAgent.instances[0]
+    assert task.status == "timeout"
+    assert agent.stopped
+    assert agent.steps >= 3
+    # A clean stop keeps the browser for the next task
+    assert session is not None
+
+
+def test_cancel_stops_agent_and_discards_session(monkeypatch):
+    monkeypatch.setattr("ollama_config.Agent", SteppingAgent)
+    SteppingAgent.instances = []
+
+    async def run():
+        executor = TaskExecutor(BrowserAgentConfig())
+        await executor.start()
+        pending = asyncio.ensure_future(executor.execute("crawl", timeout=10))
+        await asyncio.sleep(0.1)
+        session = executor.agent.browser_session
+        assert executor.cancel(1)
+        task = await pending
+        replaced = executor.agent.browser_session
+        missing = executor.cancel(1)
+        cancellations = executor.monitor.counters.get("task_cancellations")
+        await executor.close()
+        return task, session, replaced, missing, cancellations
+
+    task, session, replaced, missing, cancellations = asyncio.run(run())
+    assert task.status == "cancelled"
+    assert SteppingAgent.instances[0].stopped
+    assert not session.is_connected()
+    assert replaced is not session
+    assert missing is False
+    assert cancellations == 1
+
+
+def test_cancel_keeps_session_shared_with_other_tasks(monkeypatch):
+    monkeypatch.setattr("ollama_config.Agent", SteppingAgent)
+    SteppingAgent.instances = []
+
+    async def run():
+        executor = TaskExecutor(BrowserAgentConfig())
+        await executor.start()
+        first = asyncio.ensure_future(executor.execute("crawl a", timeout=10))
+        second = asyncio.ensure_future(executor.execute("crawl b", timeout=10))
+        await asyncio.sleep(0.1)
+        session = executor.agent.browser_session
+        executor.cancel(1)
+        cancelled = await first
+        connected = session.is_connected()
+        executor.cancel(2)
+        await second
+        await executor.close()
+        return cancelled, connected
+
+    cancelled, connected = asyncio.run(run())
+    assert cancelled.status == "cancelled"
+    assert connected
+
+
+def test_cancel_reaches_queued_and_coalesced_tasks(monkeypatch):
+    monkeypatch.setattr("ollama_config.Agent", SteppingAgent)
+    SteppingAgent.instances = []
+
+    async def run():
+        executor = TaskExecutor(BrowserAgentConfig(), max_concurrency=1, coalesce=True)
+        await executor.start()
+        leader = asyncio.ensure_future(executor.execute("crawl", timeout=0.5))
+        await asyncio.sleep(0.05)
+        follower = asyncio.ensure_future(executor.execute("crawl", timeout=0.5))
+        queued = asyncio.ensure_future(executor.execute("other", timeout=0.5))
+        await asyncio.sleep(0.05)
+        assert executor.cancel(2) and executor.cancel(3)
+        results = [await follower, await queued, await leader]
+        counters = dict(executor.monitor.counters)
+        await executor.close()
+        return results, counters
+
+    (follower, queued, leader), counters = asyncio.run(run())
+    assert follower.status == "cancelled"
+    assert queued.status == "cancelled"
+    # The leader is shielded from its follower's cancellation
+    assert leader.status == "timeout"
+    assert counters["task_cancellations"] == 2
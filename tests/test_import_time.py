@@ -0,0 +1,39 @@
+import json
+import os
+import subprocess
+import sys
+
+import ollama_config
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HEAVY = ("browser_use", "langchain_ollama", "langchain_core", "psutil")
+# Generous enough for slow CI machines while catching eager heavy imports,
+# which take seconds.
+IMPORT_BUDGET = 1.0
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import deepseek_browser.task_executor
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY,)
+
+
+def test_task_executor_import_is_light():
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.join(ROOT, "src"), ROOT]))
+    out = subprocess.run(
+        [sys.executable, "-c", SCRIPT], env=env, capture_output=True, text=True, check=True
+    )
+    result = json.loads(out.stdout)
+    assert result["loaded"] == []
+    assert result["seconds"] < IMPORT_BUDGET
+
+
+def test_logging_is_configured_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr("ollama_config.setup_logging", lambda: calls.append(1))
+    monkeypatch.setattr(ollama_config, "_logging_configured", False)
+    ollama_config.configure_logging()
+    ollama_config.configure_logging()
+    assert calls == [1]
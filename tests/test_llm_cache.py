@@ -0,0 +1,50 @@
+import pytest
+
+from deepseek_browser.llm_cache import LLMResponseCache, ReplayMiss, llm_cache_key
+from deepseek_browser.monitoring import Monitor
+
+
+def test_key_depends_on_model_parameters_and_prompt():
+    key = llm_cache_key("hello", "model=deepseek,temperature=0")
+    assert key == llm_cache_key("hello", "model=deepseek,temperature=0")
+    assert key != llm_cache_key("hello", "model=deepseek,temperature=0.7")
+    assert key != llm_cache_key("hello!", "model=deepseek,temperature=0")
+
+
+def test_hits_and_misses_are_counted():
+    monitor = Monitor()
+    cache = LLMResponseCache(monitor=monitor)
+    assert cache.lookup("prompt", "llm") is None
+    cache.update("prompt", "llm", ["answer"])
+    assert cache.lookup("prompt", "llm") == ["answer"]
+    assert monitor.counters == {"llm_cache_misses": 1, "llm_cache_hits": 1}
+
+
+def test_responses_persist_on_disk_and_are_size_capped(tmp_path):
+    path = str(tmp_path / "llm.db")
+    cache = LLMResponseCache(path, max_entries=2)
+    for i in range(3):
+        cache.update(f"p{i}", "llm", [i])
+    cache.close()
+
+    reopened = LLMResponseCache(path, max_entries=2)
+    assert len(reopened) == 2
+    assert reopened.lookup("p0", "llm") is None
+    assert reopened.lookup("p2", "llm") == [2]
+    reopened.close()
+
+
+def test_strict_replay_fails_on_miss_and_never_records():
+    cache = LLMResponseCache(strict=True)
+    with pytest.raises(ReplayMiss):
+        cache.lookup("new prompt", "llm")
+    cache.update("new prompt", "llm", ["answer"])
+    assert len(cache) == 0
+
+
+def test_langchain_adapter_delegates():
+    pytest.importorskip("langchain_core")
+    cache = LLMResponseCache()
+    adapter = cache.langchain_cache()
+    adapter.update("prompt", "llm", ["answer"])
+    assert adapter.lookup("prompt", "llm") == ["answer"]
@@ -0,0 +1,46 @@
+import asyncio
+
+from deepseek_browser.llm_pool import OllamaEndpointPool
+
+
+def make_pool(**kwargs):
+    return OllamaEndpointPool(["http://a", "http://b"], lambda url: url, **kwargs)
+
+
+def test_acquire_prefers_least_outstanding():
+    pool = make_pool()
+    first = pool.acquire()
+    second = pool.acquire()
+    assert first is not second
+    pool.release(second)
+    assert pool.acquire() is second
+
+
+def test_endpoint_ejected_after_consecutive_failures():
+    pool = make_pool(max_failures=2)
+    a, b = pool.endpoints
+    for _ in range(2):
+        a.outstanding += 1
+        pool.release(a, ok=False)
+    assert a.ejected and not b.ejected
+    assert all(pool.acquire() is b for _ in range(3))
+
+
+def test_health_check_ejects_and_readmits():
+    healthy = {"http://a": True, "http://b": True}
+
+    def probe(url, timeout):
+        if not healthy[url]:
+            raise ConnectionError("down")
+
+    pool = make_pool(probe=probe)
+    a, b = pool.endpoints
+    healthy["http://a"] = False
+    asyncio.run(pool.check())
+    assert a.ejected and not b.ejected
+    assert pool.acquire() is b
+
+    healthy["http://a"] = True
+    asyncio.run(pool.check())
+    assert not a.ejected
+    assert a.last_latency is not None
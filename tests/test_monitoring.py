@@ -39,3 +39,31 @@ def test_resource_usage():
     mon = Monitor()
     usage = mon.resource_usage()
     assert "cpu_percent" in usage
+
+
+class _Task:
+    def __init__(self, task_id, status="success", template=None):
+        self.task_id = task_id
+        self.description = "demo"
+        self.status = status
+        self.error = None
+        self.template = template
+
+
+def test_retention_bounds_memory_but_keeps_summaries():
+    mon = Monitor(retention=10)
+    for i in range(1000):
+        mon.record_task(_Task(i, template="news"), duration=(i % 100) / 10)
+        mon.record_model_call(task_id=i, duration=0.5)
+        mon.record_warmup("browser", 0.1)
+    assert len(mon.tasks) == 10
+    assert len(mon.model_calls) == 10
+    assert len(mon.warmups) == 10
+    assert mon.tasks[-1].task_id == 999
+    summary = mon.summary()
+    (tasks,) = summary["tasks"]
+    assert tasks["status"] == "success" and tasks["template"] == "news"
+    assert tasks["count"] == 1000
+    assert abs(tasks["p50"] - 4.95) < 0.1
+    assert abs(tasks["p99"] - 9.8) < 0.2
+    assert summary["model_calls"][0]["count"] == 1000
@@ -0,0 +1,72 @@
+import asyncio
+
+from deepseek_browser.monitoring import Monitor
+from deepseek_browser.prometheus import PrometheusExporter
+from deepseek_browser.task_executor import TaskExecutor
+
+
+class DummyAgent:
+    async def create_agent(self):
+        pass
+
+    async def run_task(self, description: str, task_id=None):
+        if description == "slow":
+            await asyncio.sleep(1)
+        return ["ok"]
+
+    async def close(self):
+        pass
+
+
+def test_exporter_fed_by_monitor():
+    exporter = PrometheusExporter(rss_provider=lambda: 1024)
+    monitor = Monitor(exporter=exporter)
+
+    async def run():
+        executor = TaskExecutor(agent=DummyAgent(), monitor=monitor)
+        await executor.execute("demo", template="news_summarization")
+        await executor.execute("slow", timeout=0.01)
+        monitor.record_model_call(task_id=1, duration=0.3)
+        monitor.increment("retries")
+
+    asyncio.run(run())
+    text = exporter.render()
+    assert (
+        'deepseek_task_duration_seconds_bucket{status="success",'
+        'template="news_summarization",le="0.5"} 1'
+    ) in text
+    assert 'deepseek_task_duration_seconds_count{status="timeout",template=""} 1' in text
+    assert 'deepseek_model_call_seconds_count{status="success",template=""} 1' in text
+    assert "deepseek_task_timeouts_total 1" in text
+    assert "deepseek_retries_total 1" in text
+    assert "deepseek_tasks_in_flight 0" in text
+
+
+def test_exporter_serves_metrics_over_http():
+    async def run():
+        exporter = PrometheusExporter(rss_provider=lambda: 2048)
+        await exporter.start(host="127.0.0.1", port=0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", exporter.port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: test\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        await exporter.close()
+        return response.decode()
+
+    response = asyncio.run(run())
+    assert response.startswith("HTTP/1.1 200")
+    assert "deepseek_browser_rss_bytes 2048" in response
+
+
+def test_exporter_counts_dropped_metrics():
+    class NullSink:
+        def write(self, records):
+            pass
+
+    exporter = PrometheusExporter(rss_provider=lambda: 0)
+    monitor = Monitor(exporter=exporter, sinks=[NullSink()], max_pending=1)
+    monitor.record_model_call(task_id=1, duration=0.1)
+    monitor.record_model_call(task_id=2, duration=0.1)
+    assert monitor.counters["metrics_dropped"] == 1
+    assert "deepseek_metrics_dropped_total 1" in exporter.render()
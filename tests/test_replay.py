@@ -0,0 +1,178 @@
+import asyncio
+import json
+import re
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+from browser_use import Agent
+
+from deepseek_browser._http import HTTPServer
+from deepseek_browser.replay import (
+    OllamaRecorder,
+    OllamaReplayServer,
+    Recording,
+    StaticSiteServer,
+    exchange_key,
+    snapshot_page,
+)
+from ollama_config import BrowserAgent, BrowserAgentConfig
+
+CHAT = {"model": "deepseek", "messages": [{"role": "user", "content": "hi"}], "stream": True}
+
+
+def post(url, payload):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(), method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=5) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+
+def get(url):
+    with urllib.request.urlopen(url, timeout=5) as resp:
+        return resp.read()
+
+
+async def in_thread(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+def test_exchange_key_ignores_transport_options():
+    body = json.dumps(CHAT).encode()
+    other = json.dumps({**CHAT, "stream": False, "keep_alive": "5m"}).encode()
+    assert exchange_key("/api/chat", body) == exchange_key("/api/chat", other)
+    assert exchange_key("/api/chat", body) != exchange_key("/api/generate", body)
+
+
+def test_record_then_replay_without_upstream(tmp_path):
+    answers = iter(
+        [
+            b'{"message":{"content":"one"},"done":true}\n',
+            b'{"message":{"content":"two"},"done":true}\n',
+        ]
+    )
+
+    async def ollama(method, path, headers, body):
+        return 200, {"Content-Type": "application/x-ndjson"}, next(answers)
+
+    async def record():
+        upstream = HTTPServer(ollama)
+        await upstream.start()
+        async with OllamaRecorder(upstream.url) as recorder:
+            first = await in_thread(post, recorder.url + "/api/chat", CHAT)
+            second = await in_thread(post, recorder.url + "/api/chat", CHAT)
+        await upstream.close()
+        recorder.recording.save(str(tmp_path / "run.json"))
+        return first, second
+
+    recorded = asyncio.run(record())
+
+    async def replay():
+        async with OllamaReplayServer(Recording.load(str(tmp_path / "run.json"))) as server:
+            replies = [await in_thread(post, server.url + "/api/chat", CHAT) for _ in range(3)]
+            miss = await in_thread(post, server.url + "/api/chat", {**CHAT, "model": "other"})
+            tags = json.loads(await in_thread(get, server.url + "/api/tags"))
+        return replies, miss, tags, server.misses
+
+    replies, miss, tags, misses = asyncio.run(replay())
+    assert replies[:2] == list(recorded)
+    assert replies[2] == replies[1]
+    assert miss[0] == 404 and misses == 1
+    assert tags["models"][0]["name"] == "deepseek"
+
+
+def test_snapshot_served_by_static_site(tmp_path):
+    async def origin(method, path, headers, body):
+        return 200, {"Content-Type": "text/html"}, f"<title>{path}</title>".encode()
+
+    async def run():
+        server = HTTPServer(origin)
+        await server.start()
+        saved = await in_thread(snapshot_page, server.url + "/docs/", str(tmp_path))
+        await server.close()
+        host = f"127.0.0.1:{server.port}"
+        async with StaticSiteServer(str(tmp_path)) as site:
+            page = await in_thread(get, f"{site.url}/{host}/docs/")
+            try:
+                await in_thread(get, f"{site.url}/../etc/passwd")
+                escaped = True
+            except urllib.error.HTTPError:
+                escaped = False
+        return saved, page, escaped
+
+    saved, page, escaped = asyncio.run(run())
+    assert saved.endswith("index.html")
+    assert page == b"<title>/docs/</title>"
+    assert not escaped
+
+
+class HTTPAgent(Agent):
+    """Asks Ollama where to go, then opens that page, like a one-step agent."""
+
+    async def run(self, max_steps=100, on_step_start=None, on_step_end=None):
+        prompt = f"Current date and time: {datetime.now():%Y-%m-%d %H:%M:%S}\nTask: {self.task}"
+        chat = {"model": self.llm.model, "messages": [{"role": "user", "content": prompt}]}
+        status, body = await in_thread(post, self.llm.base_url + "/api/chat", chat)
+        url = json.loads(body)["message"]["content"]
+        return [url, (await in_thread(get, url)).decode()]
+
+
+def test_run_task_replays_against_a_new_site_port(monkeypatch, tmp_path):
+    monkeypatch.setattr("ollama_config.Agent", HTTPAgent)
+    (tmp_path / "pages" / "example.com").mkdir(parents=True)
+    (tmp_path / "pages" / "example.com" / "index.html").write_text("<h1>Example</h1>")
+    pages = str(tmp_path / "pages")
+
+    async def ollama(method, path, headers, body):
+        prompt = json.loads(body)["messages"][0]["content"]
+        url = re.search(r"http://\S+", prompt).group(0)
+        return 200, {"Content-Type": "application/json"}, json.dumps({"message": {"content": url}}).encode()
+
+    async def run_task(ollama_url, site):
+        agent = BrowserAgent(BrowserAgentConfig(ollama_url=ollama_url))
+        try:
+            return await agent.run_task(f"Open {site.url}/example.com/ and report the heading")
+        finally:
+            await agent.close()
+
+    async def record():
+        upstream = HTTPServer(ollama)
+        await upstream.start()
+        async with StaticSiteServer(pages) as site, OllamaRecorder(
+            upstream.url, aliases={"site": site.url}
+        ) as recorder:
+            await run_task(recorder.url, site)
+        await upstream.close()
+        recorder.recording.save(str(tmp_path / "run.json"))
+
+    async def replay():
+        async with StaticSiteServer(pages) as site, OllamaReplayServer(
+            Recording.load(str(tmp_path / "run.json")), aliases={"site": site.url}
+        ) as server:
+            history = await run_task(server.url, site)
+        return site.url, history, server.misses
+
+    asyncio.run(record())
+    site_url, history, misses = asyncio.run(replay())
+    assert misses == 0
+    assert history == [f"{site_url}/example.com/", "<h1>Example</h1>"]
+
+
+def test_http_server_rejects_malformed_content_length():
+    async def handler(method, path, headers, body):
+        return 200, {}, b"ok"
+
+    async def run():
+        server = HTTPServer(handler)
+        await server.start()
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(b"POST /api/chat HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+        await writer.drain()
+        status = await reader.readline()
+        writer.close()
+        await server.close()
+        return status
+
+    assert asyncio.run(run()).startswith(b"HTTP/1.1 400")
@@ -0,0 +1,73 @@
+import subprocess
+import sys
+import time
+
+import psutil
+
+from deepseek_browser.monitoring import Monitor
+from deepseek_browser.resources import ResourceSampler
+
+_BUSY = "import time\nend = time.time() + 5\nwhile time.time() < end:\n    pass\n"
+
+
+class _Task:
+    task_id = 1
+    description = "demo"
+    status = "success"
+    error = None
+    template = None
+
+
+def test_sampler_attributes_process_tree_to_task():
+    # Parent process spawning a busy child, like a browser and its renderer
+    parent = subprocess.Popen(
+        [sys.executable, "-c", f"import subprocess, sys; subprocess.run([sys.executable, '-c', {_BUSY!r}])"]
+    )
+    try:
+        sampler = ResourceSampler()
+        monitor = Monitor(sampler=sampler)
+        monitor.track_browser(1, parent.pid)
+        sampler.sample()
+        time.sleep(0.3)
+        sampler.sample()
+        monitor.record_task(_Task(), duration=0.3)
+    finally:
+        for child in psutil.Process(parent.pid).children(recursive=True):
+            child.kill()
+        parent.kill()
+        parent.wait()
+
+    metric = monitor.tasks[0]
+    assert metric.cpu_seconds > 0.05
+    assert metric.peak_rss > 0
+    assert metric.net_bytes is not None
+
+
+def test_concurrent_tasks_have_no_network_attribution():
+    sampler = ResourceSampler()
+    sampler.track(1, 999999)
+    sampler.track(2, 999999)
+    usage = sampler.untrack(1)
+    assert usage.net_bytes is None
+    assert usage.cpu_seconds == 0
+    assert sampler.untrack(3) is None
+
+
+def test_short_task_measured_without_background_samples():
+    busy = subprocess.Popen([sys.executable, "-c", _BUSY])
+    try:
+        time.sleep(0.3)
+        sampler = ResourceSampler()
+        sampler.track(1, busy.pid)
+        sampler.track(2, busy.pid)
+        time.sleep(0.3)
+        usage = sampler.untrack(1)
+        other = sampler.untrack(2)
+    finally:
+        busy.kill()
+        busy.wait()
+
+    # Only time after tracking counts, although the process ran before
+    assert 0.05 < usage.cpu_seconds < 0.5
+    assert usage.peak_rss > 0
+    assert usage.shared and other.shared
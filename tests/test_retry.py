@@ -0,0 +1,99 @@
+import pytest
+
+from deepseek_browser.llm_cache import ReplayMiss
+from deepseek_browser.retry import (
+    LLM_UNAVAILABLE,
+    NAVIGATION_TIMEOUT,
+    REPLAY_MISS,
+    SESSION_CRASH,
+    TASK_ERROR,
+    CircuitBreaker,
+    CircuitOpenError,
+    DEFAULT_RETRY_POLICIES,
+    RetryPolicy,
+    classify_error,
+)
+
+
+class ConnectError(Exception):
+    """Stands in for httpx.ConnectError."""
+
+
+class ResponseError(Exception):
+    """Stands in for ollama.ResponseError."""
+
+    def __init__(self, status_code):
+        super().__init__("server error")
+        self.status_code = status_code
+
+
+class Session:
+    def __init__(self, connected):
+        self.connected = connected
+
+    def is_connected(self):
+        return self.connected
+
+
+def test_classify_error():
+    assert classify_error(ConnectError("refused")) == LLM_UNAVAILABLE
+    assert classify_error(ResponseError(503)) == LLM_UNAVAILABLE
+    assert classify_error(ResponseError(404)) == TASK_ERROR
+    assert classify_error(RuntimeError("boom"), Session(connected=False)) == SESSION_CRASH
+    assert classify_error(RuntimeError("Target closed")) == SESSION_CRASH
+    assert classify_error(RuntimeError("Navigation timeout of 30000 ms exceeded")) == NAVIGATION_TIMEOUT
+    assert classify_error(ValueError("no such button"), Session(connected=True)) == TASK_ERROR
+
+
+def test_classify_error_follows_cause():
+    try:
+        try:
+            raise ConnectError("refused")
+        except ConnectError as exc:
+            raise RuntimeError("LLM call failed") from exc
+    except RuntimeError as exc:
+        assert classify_error(exc) == LLM_UNAVAILABLE
+
+
+def test_replay_miss_is_never_retried():
+    try:
+        try:
+            raise ReplayMiss("prompt not recorded")
+        except ReplayMiss as exc:
+            raise RuntimeError("LLM call failed") from exc
+    except RuntimeError as exc:
+        assert classify_error(exc, Session(connected=True)) == REPLAY_MISS
+    assert DEFAULT_RETRY_POLICIES[REPLAY_MISS].max_retries == 0
+
+
+def test_backoff_is_capped_and_jittered():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    delays = [policy.delay(5) for _ in range(200)]
+    assert all(0 <= d <= 4.0 for d in delays)
+    assert len(set(delays)) > 1
+    assert RetryPolicy().delay(3) == 0
+
+
+def test_circuit_breaker_opens_and_recovers(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("deepseek_browser.retry.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    breaker.check()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    now[0] += 10
+    breaker.check()  # trial call
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    now[0] += 10
+    breaker.check()
+    breaker.record_success()
+    assert breaker.state == "closed"
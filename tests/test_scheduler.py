@@ -0,0 +1,81 @@
+import asyncio
+
+from deepseek_browser.scheduler import PRIORITY_HIGH, PRIORITY_LOW, TaskScheduler
+from deepseek_browser.task_executor import TaskExecutor
+
+
+def test_scheduler_priority_and_fifo_order():
+    async def run():
+        scheduler = TaskScheduler(max_concurrency=1)
+        order = []
+        await scheduler.acquire()
+
+        async def job(name, priority):
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        jobs = [
+            asyncio.ensure_future(job("low", PRIORITY_LOW)),
+            asyncio.ensure_future(job("high-1", PRIORITY_HIGH)),
+            asyncio.ensure_future(job("high-2", PRIORITY_HIGH)),
+        ]
+        await asyncio.sleep(0)
+        depth = scheduler.queue_depth
+        scheduler.release()
+        await asyncio.gather(*jobs)
+        return order, depth, scheduler.running
+
+    order, depth, running = asyncio.run(run())
+    assert depth == 3
+    assert order == ["high-1", "high-2", "low"]
+    assert running == 0
+
+
+def test_scheduler_cancelled_waiter_frees_queue():
+    async def run():
+        scheduler = TaskScheduler(max_concurrency=1)
+        await scheduler.acquire()
+        waiter = asyncio.ensure_future(scheduler.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release()
+        return scheduler.queue_depth, scheduler.running
+
+    assert asyncio.run(run()) == (0, 0)
+
+
+class CountingAgent:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def create_agent(self):
+        pass
+
+    async def run_task(self, description: str):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return [description]
+
+    async def close(self):
+        pass
+
+
+def test_executor_caps_concurrency():
+    agent = CountingAgent()
+
+    async def run():
+        executor = TaskExecutor(agent=agent, max_concurrency=2)
+        await executor.start()
+        tasks = await asyncio.gather(*(executor.execute(f"t{i}") for i in range(6)))
+        await executor.close()
+        return tasks, executor.monitor
+
+    tasks, monitor = asyncio.run(run())
+    assert all(t.status == "success" for t in tasks)
+    assert agent.peak == 2
+    assert len(monitor.queue_waits) == 6
+    assert max(q.queue_depth for q in monitor.queue_waits) > 0
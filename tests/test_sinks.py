@@ -0,0 +1,60 @@
+import asyncio
+import json
+import sqlite3
+
+from deepseek_browser.monitoring import Monitor
+from deepseek_browser.sinks import JSONLSink, SQLiteSink
+from deepseek_browser.task_executor import TaskExecutor
+
+
+class DummyAgent:
+    async def create_agent(self):
+        pass
+
+    async def run_task(self, description: str, task_id=None):
+        return ["ok"]
+
+    async def close(self):
+        pass
+
+
+def test_sinks_receive_records_in_batches(tmp_path):
+    jsonl = tmp_path / "metrics.jsonl"
+    db = tmp_path / "metrics.db"
+
+    async def run():
+        monitor = Monitor(
+            sinks=[JSONLSink(str(jsonl)), SQLiteSink(str(db))],
+            flush_interval=60,
+            flush_size=4,
+        )
+        executor = TaskExecutor(agent=DummyAgent(), monitor=monitor)
+        await executor.start()
+        for i in range(4):
+            await executor.execute(f"task {i}")
+        # the size policy wakes the flusher before the interval expires
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if jsonl.read_text():
+                break
+        flushed_early = len(jsonl.read_text().splitlines())
+        await executor.execute("last")
+        await executor.close()
+        return flushed_early
+
+    flushed_early = asyncio.run(run())
+    assert flushed_early == 4
+    lines = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    assert [r["kind"] for r in lines] == ["task"] * 5
+    assert lines[-1]["description"] == "last"
+    rows = sqlite3.connect(str(db)).execute("SELECT kind FROM metrics").fetchall()
+    assert len(rows) == 5
+
+
+def test_records_are_not_written_synchronously(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    monitor = Monitor(sinks=[JSONLSink(str(path))])
+    monitor.record_model_call(task_id=1, duration=0.1)
+    assert path.read_text() == ""
+    monitor.flush_sync()
+    assert json.loads(path.read_text())["kind"] == "model_call"
@@ -0,0 +1,35 @@
+import random
+
+from deepseek_browser.sketch import QuantileSketch
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(0)
+    values = [rng.lognormvariate(0, 1) for _ in range(20000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for v in values:
+        sketch.add(v)
+    values.sort()
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) / exact < 0.02
+    assert sketch.count == len(values)
+    assert sketch.min == values[0] and sketch.max == values[-1]
+    assert len(sketch.buckets) < 2048
+
+
+def test_merge_matches_single_sketch():
+    a, b, combined = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i in range(1, 1001):
+        (a if i % 2 else b).add(i / 100)
+        combined.add(i / 100)
+    a.merge(b)
+    assert a.count == combined.count
+    assert a.quantile(0.95) == combined.quantile(0.95)
+    assert a.to_dict()["p99"] == combined.to_dict()["p99"]
+
+
+def test_empty_sketch():
+    sketch = QuantileSketch()
+    assert sketch.quantile(0.5) is None
+    assert sketch.to_dict()["min"] is None
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import time
+
+from browser_use import BrowserSession
+
+from deepseek_browser.monitoring import Monitor
+from deepseek_browser.pool import BrowserSessionPool
+from deepseek_browser.storage_state import StorageStateStore, filter_storage_state, task_domain
+from ollama_config import BrowserAgent, BrowserAgentConfig
+
+STATE = {
+    "cookies": [
+        {"name": "sid", "value": "1", "domain": ".example.com", "path": "/"},
+        {"name": "ad", "value": "2", "domain": ".doubleclick.net", "path": "/"},
+    ],
+    "origins": [
+        {"origin": "https://www.example.com", "localStorage": [{"name": "consent", "value": "yes"}]},
+        {"origin": "https://tracker.io", "localStorage": [{"name": "id", "value": "x"}]},
+    ],
+}
+
+
+class FakeContext:
+    def __init__(self):
+        self.cookies = []
+        self.scripts = []
+
+    async def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+    async def add_init_script(self, script):
+        self.scripts.append(script)
+
+    async def storage_state(self):
+        return STATE
+
+
+class StatefulSession(BrowserSession):
+    def __init__(self, browser_profile=None):
+        super().__init__(browser_profile)
+        self.browser_context = FakeContext()
+
+
+def test_task_domain():
+    assert task_domain("Log in at https://www.Example.com/login and export") == "example.com"
+    assert task_domain("Summarize the front page of news.ycombinator.com") == "news.ycombinator.com"
+    assert task_domain("Write a haiku") is None
+    assert task_domain("Upgrade node.js, then attach report.txt and README.md") is None
+    assert task_domain("Read the node.js docs on nodejs.org") == "nodejs.org"
+
+
+def test_filter_keeps_site_cookies_and_origins():
+    state = filter_storage_state(STATE, "example.com")
+    assert [c["name"] for c in state["cookies"]] == ["sid"]
+    assert [o["origin"] for o in state["origins"]] == ["https://www.example.com"]
+
+
+def test_store_evicts_by_count_and_age(tmp_path):
+    store = StorageStateStore(str(tmp_path), max_age=60, max_entries=2)
+    for i, domain in enumerate(["a.com", "b.com", "c.com"]):
+        store.save(domain, {"cookies": [], "origins": []})
+        os.utime(store.path(domain), (time.time() - 10 + i, time.time() - 10 + i))
+        store.evict()
+    assert store.load("a.com") is None
+    assert store.load("c.com") == {"cookies": [], "origins": []}
+    old = time.time() - 120
+    os.utime(store.path("b.com"), (old, old))
+    assert store.load("b.com") is None
+    assert len(store) == 1
+
+
+def test_pool_prefers_session_of_same_key():
+    class Session:
+        def is_connected(self):
+            return True
+
+        async def kill(self):
+            pass
+
+    async def factory():
+        return Session()
+
+    async def run():
+        pool = BrowserSessionPool(factory, 2)
+        await pool.start()
+        first = await pool.acquire("a.com")
+        second = await pool.acquire()
+        await pool.release(second, key="b.com")
+        await pool.release(first, key="a.com")
+        again = await pool.acquire("a.com")
+        await pool.close()
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert again is first
+
+
+def test_state_survives_agent_restart(monkeypatch, tmp_path):
+    monkeypatch.setattr("ollama_config.BrowserSession", StatefulSession)
+    config = BrowserAgentConfig(storage_state_dir=str(tmp_path))
+
+    async def run_once():
+        monitor = Monitor()
+        agent = BrowserAgent(config, monitor=monitor)
+        await agent.create_agent()
+        await agent.run_task("Check the dashboard on https://example.com")
+        await agent.run_task("Check the inbox on https://example.com")
+        context = agent.browser_session.browser_context
+        await agent.close()
+        return context, monitor.counters
+
+    first, counters = asyncio.run(run_once())
+    second, _ = asyncio.run(run_once())
+    assert first.cookies == []
+    assert counters["storage_states_saved"] == 2
+    assert [c["name"] for c in second.cookies] == ["sid"]
+    assert len(second.scripts) == 1 and "consent" in second.scripts[0]
+    # Saved values only fill keys the site has not set in this tab
+    assert "localStorage.getItem(k) === null" in second.scripts[0]
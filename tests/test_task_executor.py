@@ -44,3 +44,91 @@ def test_execute_timeout():
 
     task = asyncio.run(run())
     assert task.status == "timeout"
+
+
+class DelayAgent(MockAgent):
+    async def run_task(self, description: str):
+        await asyncio.sleep(float(description))
+        return [description]
+
+
+def test_execute_many_streams_as_completed():
+    consumed = []
+
+    def descriptions():
+        for delay in ["0.05", "0.01", "0.03"]:
+            consumed.append(delay)
+            yield delay
+
+    async def run():
+        executor = TaskExecutor(agent=DelayAgent())
+        await executor.start()
+        updates = []
+        order = []
+        pulled = []
+        async for task in executor.execute_many(
+            descriptions(), concurrency=2, progress=lambda p: updates.append(p.completed)
+        ):
+            order.append(task.description)
+            pulled.append(len(consumed))
+        await executor.close()
+        return order, updates, pulled
+
+    order, updates, pulled = asyncio.run(run())
+    assert order == ["0.01", "0.03", "0.05"]
+    assert updates == [1, 2, 3]
+    assert pulled[0] == 2
+
+
+def test_execute_many_accepts_async_iterable():
+    async def descriptions():
+        for i in range(3):
+            yield f"task {i}"
+
+    async def run():
+        executor = TaskExecutor(agent=MockAgent())
+        results = [t async for t in executor.execute_many(descriptions(), concurrency=1)]
+        return results
+
+    results = asyncio.run(run())
+    assert [t.status for t in results] == ["success"] * 3
+
+
+class CountingSlowAgent(MockAgent):
+    def __init__(self):
+        self.calls = 0
+
+    async def run_task(self, description: str):
+        self.calls += 1
+        await asyncio.sleep(0.02)
+        return [f"handled {description}"]
+
+
+def test_execute_coalesces_identical_tasks():
+    agent = CountingSlowAgent()
+
+    async def run():
+        executor = TaskExecutor(agent=agent, coalesce=True)
+        tasks = await asyncio.gather(
+            executor.execute("news about AI"),
+            executor.execute("news about AI"),
+            executor.execute("news about ML"),
+        )
+        return executor, tasks
+
+    executor, tasks = asyncio.run(run())
+    assert agent.calls == 2
+    assert [t.status for t in tasks] == ["success"] * 3
+    assert tasks[0].task_id != tasks[1].task_id
+    assert tasks[1].result.history is tasks[0].result.history
+    assert executor.monitor.counters["coalesced_tasks"] == 1
+    assert not executor._inflight
+
+
+def test_coalesced_followers_share_timeout():
+    async def run():
+        executor = TaskExecutor(agent=SlowAgent(), default_timeout=0.05, coalesce=True)
+        return await asyncio.gather(executor.execute("slow"), executor.execute("slow"))
+
+    tasks = asyncio.run(run())
+    assert [t.status for t in tasks] == ["timeout", "timeout"]
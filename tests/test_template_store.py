@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from deepseek_browser.template_store import TemplateStore
+from deepseek_browser.templates import TaskTemplate, TemplateLibrary
+
+
+def test_store_keeps_version_history(tmp_path):
+    path = str(tmp_path / "templates.db")
+    store = TemplateStore(path)
+    store.add(
+        TaskTemplate(name="news", content="News about {topic}"),
+        category="research",
+        tags=["text"],
+    )
+    store.add(
+        TaskTemplate(name="news", content="Latest news on {topic}", version=2),
+        category="research",
+    )
+    store.add(
+        TaskTemplate(name="prices", content="Prices for {product}"),
+        category="shopping",
+        tags=["text"],
+    )
+    with pytest.raises(ValueError):
+        store.add(TaskTemplate(name="news", content="old {topic}", version=2))
+    store.close()
+
+    reopened = TemplateStore(path)
+    assert reopened.versions("news") == [1, 2]
+    assert reopened.get("news").render(topic="AI") == "Latest news on AI"
+    assert reopened.get("news", version=1).render(topic="AI") == "News about AI"
+    assert reopened.get("news") is reopened.get("news", 2)
+    assert reopened.find(category="research") == ["news"]
+    # tags belong to a version: only v1 of news was tagged
+    assert reopened.find(tag="text") == ["prices"]
+    with pytest.raises(KeyError):
+        reopened.get("news", version=3)
+    assert "missing" not in reopened
+
+
+def test_store_import_is_atomic():
+    store = TemplateStore()
+    data = json.dumps(
+        [
+            {"name": "a", "content": "A {x}", "tags": ["t"]},
+            {"name": "a", "content": "dup {x}"},
+        ]
+    )
+    with pytest.raises(ValueError):
+        store.import_json(data)
+    assert "a" not in store
+    assert store.import_json(json.dumps([{"name": "a", "content": "A {x}", "category": "c"}])) == 1
+    assert store.find(category="c") == ["a"]
+
+
+def test_library_loads_lazily_from_store():
+    store = TemplateStore()
+    store.add(TaskTemplate(name="t", content="A {x}"))
+    lib = TemplateLibrary(store=store)
+    assert lib.render("t", x="1") == "A 1"
+    lib.add(TaskTemplate(name="t", content="B {x}", version=2), tags=["v2"])
+    assert store.versions("t") == [1, 2]
+    assert lib.get("t", version=1).render(x="1") == "A 1"
+    assert list(lib.render_many("t", [{"x": "1"}], version=1)) == ["A 1"]
+    assert lib.render("t", x="1") == "B 1"
+    with pytest.raises(ValueError):
+        TemplateLibrary(store=store).add(TaskTemplate(name="t", content="C {x}", version=2))
@@ -40,3 +40,62 @@ def test_compose_and_io():
     data = lib.export_json()
     lib2 = TemplateLibrary.import_json(data)
     assert lib2.render("a", name="Bob") == "Hello Bob"
+
+
+def test_render_plan_is_cached_and_invalidated():
+    tpl = TaskTemplate(name="t", content="Find {topic} on {site} {{raw}}")
+    plan = tpl.compile()
+    assert tpl.compile() is plan
+    assert plan.slots == ("topic", "site")
+    assert tpl.variables() == {"topic", "site"}
+    assert tpl.render(topic="AI", site="web") == "Find AI on web {raw}"
+    tpl.version = 2
+    tpl.content = "Search {topic}"
+    assert tpl.compile() is not plan
+    assert tpl.render(topic="AI") == "Search AI"
+
+
+def test_render_plan_falls_back_for_format_specs():
+    tpl = TaskTemplate(name="t", content="{price:>6} {name!r}")
+    assert not tpl.compile().simple
+    assert tpl.render(price="5", name="x") == "     5 'x'"
+
+
+def test_library_compiles_on_add():
+    lib = TemplateLibrary()
+    tpl = TaskTemplate(name="t", content="A {x}")
+    lib.add(tpl)
+    assert tpl._plan is not None
+
+
+def test_render_many_streams_rows_and_collects_errors():
+    import csv
+    import io
+
+    lib = TemplateLibrary()
+    lib.add(TaskTemplate(name="search", content="Find {topic} news"))
+    reader = csv.DictReader(io.StringIO("topic,extra\nAI,1\nML,2\n"))
+    consumed = []
+
+    def rows():
+        for row in [*reader, {"other": "x"}, {"topic": "Go"}]:
+            consumed.append(row)
+            yield row
+
+    batch = lib.render_many("search", rows())
+    it = iter(batch)
+    assert next(it) == "Find AI news"
+    assert len(consumed) == 1
+    assert list(it) == ["Find ML news", "Find Go news"]
+    assert batch.rendered == 3
+    assert [e.index for e in batch.errors] == [2]
+    assert "Missing variables: topic" in batch.errors[0].error
+
+
+def test_compose_many():
+    lib = TemplateLibrary()
+    lib.add(TaskTemplate(name="a", content="Hello {name}"))
+    lib.add(TaskTemplate(name="b", content="from {place}"))
+    batch = lib.compose_many(["a", "b"], [{"name": "Bob", "place": "Paris"}, {"name": "Al"}])
+    assert list(batch) == ["Hello Bob from Paris"]
+    assert batch.errors[0].index == 1
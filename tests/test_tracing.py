@@ -0,0 +1,72 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from browser_use import Agent
+
+from deepseek_browser.monitoring import Monitor
+from deepseek_browser.tracing import StepSpan, _current_tracer, spans_to_otel
+from ollama_config import BrowserAgent, BrowserAgentConfig
+
+
+class SteppingAgent(Agent):
+    """Agent running two steps, each with one LLM call and one action."""
+
+    async def run(self, on_step_start=None, on_step_end=None):
+        self.state = SimpleNamespace(n_steps=1, history=SimpleNamespace(history=[]))
+        for action in ("go_to_url", "extract_content"):
+            await on_step_start(self)
+            tracer = _current_tracer.get()
+            tracer.llm_start("run")
+            await asyncio.sleep(0.02)
+            tracer.llm_end("run", prompt_tokens=100, completion_tokens=7)
+            await asyncio.sleep(0.01)
+            output = SimpleNamespace(action=[{action: {"x": 1}}])
+            self.state.history.history.append(SimpleNamespace(model_output=output))
+            await on_step_end(self)
+            self.state.n_steps += 1
+        return ["done"]
+
+
+def test_step_spans_split_llm_and_action_time(monkeypatch, tmp_path):
+    monkeypatch.setattr("ollama_config.Agent", SteppingAgent)
+    monkeypatch.setattr("ollama_config.llm_callback_handler", lambda: "handler")
+    monitor = Monitor()
+
+    async def run():
+        agent = BrowserAgent(BrowserAgentConfig(trace_steps=True), monitor=monitor)
+        await agent.create_agent()
+        callbacks = agent.llm.kwargs["callbacks"]
+        await agent.run_task("trace me", task_id=3)
+        await agent.close()
+        return callbacks
+
+    assert asyncio.run(run()) == ["handler"]
+    assert [s.step for s in monitor.steps] == [1, 2]
+    first = monitor.steps[0]
+    assert first.task_id == 3
+    assert first.action == "go_to_url"
+    assert first.llm_calls == 1
+    assert (first.prompt_tokens, first.completion_tokens) == (100, 7)
+    assert first.llm_latency >= 0.02
+    assert 0.005 < first.action_duration < first.end - first.start
+
+    path = tmp_path / "trace.json"
+    monitor.export_otel_json(str(path))
+    data = json.loads(path.read_text())
+    spans = data["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(spans) == 2
+    assert len(spans[0]["traceId"]) == 32 and len(spans[0]["spanId"]) == 16
+    attrs = {a["key"]: a["value"] for a in spans[1]["attributes"]}
+    assert attrs["browser.action"] == {"stringValue": "extract_content"}
+    assert attrs["gen_ai.usage.input_tokens"] == {"intValue": "100"}
+
+
+def test_spans_to_otel_groups_tasks_into_traces():
+    spans = [
+        StepSpan(task_id=1, step=1, start=1.0, end=2.0),
+        StepSpan(task_id=2, step=1, start=1.0, end=2.0),
+    ]
+    otel = spans_to_otel(spans, trace_seed=5)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert otel[0]["traceId"] != otel[1]["traceId"]
+    assert otel[0]["startTimeUnixNano"] == "1000000000"